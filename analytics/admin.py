@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import DailyCategorySales, DailyProductSales, DailySales
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = ("date", "orders", "units", "revenue")
+    date_hierarchy = "date"
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(admin.ModelAdmin):
+    list_display = ("date", "category", "orders", "units", "revenue")
+    list_filter = ("category",)
+    date_hierarchy = "date"
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    list_display = ("date", "product", "orders", "units", "revenue")
+    raw_id_fields = ("product",)
+    date_hierarchy = "date"
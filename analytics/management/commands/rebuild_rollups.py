@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily sales rollups from all orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk_create batch")
+
+    def handle(self, *args, batch_size, **kwargs):
+        self.stdout.write("📊 Rebuilding sales rollups...")
+        counts = rebuild_rollups(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rollups rebuilt ({counts['days']} days, {counts['category_rows']} category rows, "
+            f"{counts['product_rows']} product rows)"
+        ))
@@ -0,0 +1,56 @@
+from django.db import models
+from products.models import Category, Product
+
+# Daily sales rollups, maintained by analytics.rollups. Orders count from
+# checkout until they are cancelled; revenue here is what customers paid
+# (order totals), on the category/product tables it is the goods value
+# (quantity x price). Counters are plain integers so a drifted row can go
+# negative instead of failing a checkout; rebuild_rollups resyncs them.
+
+
+class DailySales(models.Model):
+    date = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily sales"
+
+    def __str__(self):
+        return f"{self.date}: {self.revenue}"
+
+
+class DailyCategorySales(models.Model):
+    date = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="daily_sales")
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily category sales"
+        constraints = [
+            # Upsert target; also serves date range scans
+            models.UniqueConstraint(fields=["date", "category"], name="category_sales_date_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.category}: {self.revenue}"
+
+
+class DailyProductSales(models.Model):
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="daily_sales")
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily product sales"
+        constraints = [
+            models.UniqueConstraint(fields=["date", "product"], name="product_sales_date_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.product}: {self.revenue}"
@@ -0,0 +1,197 @@
+"""
+Daily sales rollups for the admin dashboard.
+
+Checkout, status changes and order deletes add or subtract their orders'
+sales here, so dashboard queries read a few rows per day instead of
+aggregating Order/OrderItem. Increments are computed inside the caller's
+transaction and written after it commits, as one INSERT ... ON CONFLICT
+DO UPDATE per table: the shared per-day rows are locked only for that
+short write, never for the rest of a checkout.
+
+Increments use the category a product is in at the time; moving or
+deleting products makes old rows drift, and rebuild_rollups() recomputes
+everything from the orders.
+"""
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from .models import DailyCategorySales, DailyProductSales, DailySales
+
+# Orders in these statuses are not sales
+EXCLUDED_STATUSES = ("cancelled",)
+
+COUNTERS = ("orders", "units", "revenue")
+
+# Rows per INSERT, well under SQLite's 999 parameter limit
+UPSERT_BATCH_SIZE = 100
+
+REVENUE = DecimalField(max_digits=14, decimal_places=2)
+
+
+def counts_as_sale(status):
+    return status not in EXCLUDED_STATUSES
+
+
+def increments(orders, sign):
+    """
+    ``{model: {key: [orders, units, revenue]}}`` for ``(day, total, items)``
+    orders, where items are ``(product_id, category_id, quantity, price)``.
+    """
+    tables = {DailySales: {}, DailyCategorySales: {}, DailyProductSales: {}}
+
+    def add(model, key, units, revenue):
+        counters = tables[model].setdefault(key, [0, 0, Decimal("0")])
+        counters[0] += sign
+        counters[1] += sign * units
+        counters[2] += sign * revenue
+
+    for day, total, items in orders:
+        add(DailySales, (day,), sum(item[2] for item in items), total)
+
+        # Items of deleted products only count towards the day
+        items = [item for item in items if item[0] is not None]
+        for index, model in ((1, DailyCategorySales), (0, DailyProductSales)):
+            for key, lines in groupby(sorted(items, key=itemgetter(index)), itemgetter(index)):
+                lines = list(lines)
+                add(
+                    model, (day, key),
+                    sum(quantity for *_, quantity, price in lines),
+                    sum(quantity * price for *_, quantity, price in lines),
+                )
+    return tables
+
+
+def upsert(model, keys, rows):
+    """
+    Add ``rows`` ({key tuple: counters}) onto the model's rows, creating
+    missing ones. SQLite and PostgreSQL share the ON CONFLICT syntax.
+    """
+    fields = [model._meta.get_field(name) for name in (*keys, *COUNTERS)]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = [quote(field.column) for field in fields]
+    updates = ", ".join(f"{column} = {table}.{column} + EXCLUDED.{column}" for column in columns[len(keys):])
+
+    # Keys in sorted order so concurrent writers lock rows in the same order
+    rows = sorted(rows.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            placeholders = ", ".join(["(" + ", ".join(["%s"] * len(fields)) + ")"] * len(batch))
+            params = [
+                field.get_db_prep_save(value, connection)
+                for key, counters in batch
+                for field, value in zip(fields, (*key, *counters))
+            ]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders} "
+                f"ON CONFLICT ({', '.join(columns[:len(keys)])}) DO UPDATE SET {updates}",
+                params,
+            )
+
+
+def write(tables):
+    with transaction.atomic():
+        for model, keys in (
+            (DailySales, ("date",)),
+            (DailyCategorySales, ("date", "category")),
+            (DailyProductSales, ("date", "product")),
+        ):
+            rows = {key: counters for key, counters in tables[model].items() if any(counters)}
+            if rows:
+                upsert(model, keys, rows)
+
+
+def apply(orders, sign):
+    tables = increments(orders, sign)
+    if tables[DailySales]:
+        transaction.on_commit(lambda: write(tables))
+
+
+def order_sales(queryset):
+    """``(day, total, items)`` for each order in ``queryset``; two queries."""
+    orders = {
+        order_id: (timezone.localdate(created_at), total, [])
+        for order_id, created_at, total in queryset.values_list("id", "created_at", "total")
+    }
+    if orders:
+        for order_id, *item in OrderItem.objects.filter(order_id__in=list(orders)).values_list(
+            "order_id", "product_id", "product__category_id", "quantity", "price",
+        ):
+            orders[order_id][2].append(item)
+    return orders.values()
+
+
+def record_checkout(order, cart_items):
+    """Add a new order, from the cart lines it was built from (no queries)."""
+    items = [
+        (item.product_id, item.product.category_id, item.quantity, item.product.price)
+        for item in cart_items
+    ]
+    apply([(timezone.localdate(order.created_at), order.total, items)], 1)
+
+
+def record_status_change(order, old_status):
+    """Cancelling an order removes its sales, un-cancelling adds them back."""
+    was_sale, is_sale = counts_as_sale(old_status), counts_as_sale(order.status)
+    if was_sale != is_sale:
+        apply(order_sales(Order.objects.filter(pk=order.pk)), 1 if is_sale else -1)
+
+
+def remove_orders(queryset):
+    """Subtract the sales of orders about to be deleted."""
+    apply(order_sales(queryset.exclude(status__in=EXCLUDED_STATUSES)), -1)
+
+
+@transaction.atomic
+def rebuild_rollups(batch_size=1000):
+    """Recompute every rollup row from the orders. Returns row counts."""
+    for model in (DailySales, DailyCategorySales, DailyProductSales):
+        model.objects.all().delete()
+
+    orders = Order.objects.exclude(status__in=EXCLUDED_STATUSES).order_by()
+    items = OrderItem.objects.exclude(order__status__in=EXCLUDED_STATUSES).order_by()
+    day = TruncDate("order__created_at")
+
+    units = dict(items.values(day=day).annotate(units=Sum("quantity")).values_list("day", "units"))
+    daily = [
+        DailySales(
+            date=row["day"], orders=row["orders"], units=units.get(row["day"], 0), revenue=row["revenue"],
+        )
+        for row in orders.values(day=TruncDate("created_at")).annotate(
+            orders=Count("id"), revenue=Sum("total"),
+        )
+    ]
+    DailySales.objects.bulk_create(daily, batch_size=batch_size)
+
+    counts = {"days": len(daily)}
+    for model, name, lookup in (
+        (DailyCategorySales, "category", "product__category"),
+        (DailyProductSales, "product", "product"),
+    ):
+        rows = (
+            items.filter(product__isnull=False)
+            .values(day=day, key=F(lookup))
+            .annotate(
+                orders=Count("order", distinct=True),
+                units=Sum("quantity"),
+                revenue=Sum(F("quantity") * F("price"), output_field=REVENUE),
+            )
+        )
+        objs = [
+            model(
+                date=row["day"], orders=row["orders"], units=row["units"], revenue=row["revenue"],
+                **{f"{name}_id": row["key"]},
+            )
+            for row in rows
+        ]
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        counts[f"{name}_rows"] = len(objs)
+    return counts
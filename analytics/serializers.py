@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+# Dashboard ranges, in days (both ends inclusive)
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+#Date range for dashboard queries (default: the last 30 days)
+class SalesRangeSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        date_to = data.get("date_to") or timezone.localdate()
+        date_from = data.get("date_from") or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+        if date_from > date_to:
+            raise serializers.ValidationError({"date_to": "Must not be before date_from"})
+        if (date_to - date_from).days >= MAX_RANGE_DAYS:
+            raise serializers.ValidationError({"date_from": f"Ranges can span at most {MAX_RANGE_DAYS} days"})
+        return {**data, "date_from": date_from, "date_to": date_to}
+
+
+class TopProductsSerializer(SalesRangeSerializer):
+    category = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
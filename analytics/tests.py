@@ -0,0 +1,216 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import CartItem
+from orders.models import Order
+from products.models import Category, Product
+from ravoos_pansy.testing import QueryBudgetMixin
+from users.models import Address, User
+from .models import DailyCategorySales, DailyProductSales, DailySales
+from .rollups import rebuild_rollups
+
+
+class AnalyticsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("buyer@example.com", "Buyer")
+        self.admin = User.objects.create_user("admin@example.com", "Admin")
+        self.admin.is_staff = True
+        self.admin.save()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.food = Category.objects.create(name="Food", slug="food", theme="food")
+        self.drinks = Category.objects.create(name="Drinks", slug="drinks", theme="drinks")
+        self.rice = Product.objects.create(name="Rice", price="100.00", category=self.food)
+        self.dal = Product.objects.create(name="Dal", price="50.00", category=self.food)
+        self.tea = Product.objects.create(name="Tea", price="20.00", category=self.drinks)
+        self.address = Address.objects.create(
+            user=self.user, full_name="Buyer", phone="1234567890", street="1 Main St",
+            city="City", state="State", pincode="123456",
+        )
+
+    def checkout(self, *lines):
+        for product, quantity in lines:
+            CartItem.objects.create(user=self.user, product=product, quantity=quantity)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/orders/checkout/", {"address_id": self.address.pk})
+        self.assertEqual(response.status_code, 200)
+        return response.data["order_id"]
+
+    def set_status(self, order_id, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"/api/orders/{order_id}/status/", {"status": status})
+        self.assertEqual(response.status_code, 200)
+
+    def snapshot(self):
+        # Rows whose orders were all cancelled stay behind as zeros; a
+        # rebuild doesn't create them
+        return (
+            list(DailySales.objects.order_by("date").values_list("date", "orders", "units", "revenue")),
+            list(DailyCategorySales.objects.exclude(orders=0).order_by("date", "category").values_list(
+                "date", "category", "orders", "units", "revenue",
+            )),
+            list(DailyProductSales.objects.exclude(orders=0).order_by("date", "product").values_list(
+                "date", "product", "orders", "units", "revenue",
+            )),
+        )
+
+
+class RollupMaintenanceTests(AnalyticsTestCase):
+    def test_checkout_adds_sales(self):
+        self.checkout((self.rice, 2), (self.dal, 1), (self.tea, 3))
+        self.checkout((self.rice, 1))
+        today = timezone.localdate()
+
+        day = DailySales.objects.get()
+        self.assertEqual((day.date, day.orders, day.units), (today, 2, 7))
+        # Order totals include 5% GST
+        self.assertEqual(day.revenue, Decimal("430.50"))
+
+        food = DailyCategorySales.objects.get(category=self.food)
+        self.assertEqual((food.orders, food.units, food.revenue), (2, 4, Decimal("350.00")))
+        rice = DailyProductSales.objects.get(product=self.rice)
+        self.assertEqual((rice.orders, rice.units, rice.revenue), (2, 3, Decimal("300.00")))
+
+    def test_cancel_and_uncancel(self):
+        order_id = self.checkout((self.rice, 1), (self.tea, 1))
+        self.set_status(order_id, "shipped")
+        self.assertEqual(DailySales.objects.get().orders, 1)
+
+        self.set_status(order_id, "cancelled")
+        self.assertEqual(DailySales.objects.get().orders, 0)
+        self.assertEqual(DailyProductSales.objects.get(product=self.tea).units, 0)
+
+        self.set_status(order_id, "placed")
+        self.assertEqual(DailySales.objects.get().revenue, Decimal("126.00"))
+
+    def test_deleting_orders_removes_their_sales(self):
+        first = self.checkout((self.rice, 1))
+        self.checkout((self.tea, 2))
+        self.set_status(first, "delivered")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/orders/{first}/delete/")
+        self.assertEqual(DailyCategorySales.objects.get(category=self.food).orders, 0)
+        self.assertEqual(DailySales.objects.get().orders, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete("/api/orders/delete-all/")
+        self.assertEqual(DailySales.objects.get().orders, 0)
+
+    def test_rebuild_matches_incremental(self):
+        orders = [
+            self.checkout((self.rice, 2), (self.tea, 1)),
+            self.checkout((self.dal, 4)),
+            self.checkout((self.tea, 5), (self.rice, 1)),
+        ]
+        self.set_status(orders[1], "cancelled")
+        incremental = self.snapshot()
+
+        rebuild_rollups()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_rebuild_command_backfills(self):
+        Order.objects.create(
+            user=self.user, subtotal="10.00", gst="0.50", total="10.50", address_text="x",
+        )
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        self.assertIn("1 days", out.getvalue())
+        self.assertEqual(DailySales.objects.get().revenue, Decimal("10.50"))
+
+
+class DashboardTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        for days_ago, revenue in ((0, "500.00"), (1, "300.00"), (40, "900.00")):
+            day = today - timedelta(days=days_ago)
+            DailySales.objects.create(date=day, orders=2, units=5, revenue=revenue)
+            DailyCategorySales.objects.create(date=day, category=self.food, orders=2, units=4, revenue="200.00")
+            DailyCategorySales.objects.create(date=day, category=self.drinks, orders=1, units=1, revenue="20.00")
+            DailyProductSales.objects.create(date=day, product=self.rice, orders=1, units=1, revenue="100.00")
+            DailyProductSales.objects.create(date=day, product=self.dal, orders=2, units=3, revenue="150.00")
+            DailyProductSales.objects.create(date=day, product=self.tea, orders=1, units=1, revenue="20.00")
+        self.client.force_authenticate(user=self.admin)
+
+    def test_sales_defaults_to_last_30_days(self):
+        response = self.client.get("/api/analytics/sales/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["totals"], {"orders": 4, "units": 10, "revenue": "800.00"})
+        self.assertEqual([day["revenue"] for day in response.data["days"]], ["300.00", "500.00"])
+
+    def test_categories(self):
+        date_from = timezone.localdate() - timedelta(days=60)
+        response = self.client.get("/api/analytics/categories/", {"date_from": date_from})
+        self.assertEqual(
+            [(row["slug"], row["orders"], row["revenue"]) for row in response.data["categories"]],
+            [("food", 6, "600.00"), ("drinks", 3, "60.00")],
+        )
+
+    def test_top_products(self):
+        response = self.client.get("/api/analytics/products/", {"limit": 2})
+        self.assertEqual(
+            [(row["name"], row["units"], row["revenue"]) for row in response.data["products"]],
+            [("Dal", 6, "300.00"), ("Rice", 2, "200.00")],
+        )
+
+        response = self.client.get("/api/analytics/products/", {"category": "drinks"})
+        self.assertEqual([row["name"] for row in response.data["products"]], ["Tea"])
+
+    def test_invalid_ranges(self):
+        today = timezone.localdate()
+        for params in (
+            {"date_from": today, "date_to": today - timedelta(days=1)},
+            {"date_from": today - timedelta(days=400)},
+            {"date_from": "yesterday"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/analytics/sales/", params).status_code, 400)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(user=self.user)
+        for url in ("/api/analytics/sales/", "/api/analytics/categories/", "/api/analytics/products/"):
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class AnalyticsQueryBudgetTests(QueryBudgetMixin, AnalyticsTestCase):
+    urlconf = "analytics.urls"
+    budgets = {
+        ("GET", "sales/"): 1,
+        ("GET", "categories/"): 1,
+        ("GET", "products/"): 1,
+    }
+
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        products = Product.objects.bulk_create(
+            Product(name=f"Product {i}", price="10.00", category=self.food) for i in range(50)
+        )
+        for days_ago in range(365):
+            day = today - timedelta(days=days_ago)
+            DailySales.objects.create(date=day, orders=1, units=1, revenue="10.00")
+            DailyProductSales.objects.bulk_create(
+                DailyProductSales(date=day, product=product, orders=1, units=1, revenue="10.00")
+                for product in products[days_ago % 10::10]
+            )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_sales(self):
+        self.assertWithinBudget("GET", "sales/", "/api/analytics/sales/", data={"date_from": "2026-01-01"})
+
+    def test_categories(self):
+        self.assertWithinBudget("GET", "categories/", "/api/analytics/categories/")
+
+    def test_products(self):
+        for params in ({}, {"category": "food", "limit": 50}):
+            self.assertWithinBudget("GET", "products/", "/api/analytics/products/", data=params)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CategorySalesView, SalesView, TopProductsView
+
+urlpatterns = [
+    path("sales/", SalesView.as_view()),
+    path("categories/", CategorySalesView.as_view()),
+    path("products/", TopProductsView.as_view()),
+]
@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+from django.db.models import F, Sum
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from products.permissions import IsAdmin
+from .models import DailyCategorySales, DailyProductSales, DailySales
+from .serializers import SalesRangeSerializer, TopProductsSerializer
+
+CENT = Decimal("0.01")
+
+# Every endpoint reads the rollup tables only: the work depends on the
+# number of days (and categories/products sold), not on the order count
+
+
+def money(value):
+    # Amounts as strings, like the rest of the API (SQLite sums drop the scale)
+    return str(Decimal(value).quantize(CENT))
+
+
+def sales_totals(rows):
+    return {
+        "orders": sum(row["orders"] for row in rows),
+        "units": sum(row["units"] for row in rows),
+        "revenue": money(sum(row["revenue"] for row in rows)),
+    }
+
+
+def range_params(serializer_class, request):
+    params = serializer_class(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    return params.validated_data
+
+
+#Revenue and order count per day
+class SalesView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        params = range_params(SalesRangeSerializer, request)
+        days = list(
+            DailySales.objects.filter(date__range=(params["date_from"], params["date_to"]))
+            .order_by("date")
+            .values("date", "orders", "units", "revenue")
+        )
+        totals = sales_totals(days)
+        for day in days:
+            day["revenue"] = money(day["revenue"])
+
+        return Response({
+            "date_from": params["date_from"],
+            "date_to": params["date_to"],
+            "totals": totals,
+            "days": days,
+        })
+
+
+#Sales per category over a date range, best selling first
+class CategorySalesView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        params = range_params(SalesRangeSerializer, request)
+        categories = list(
+            DailyCategorySales.objects.filter(date__range=(params["date_from"], params["date_to"]))
+            .values("category_id", name=F("category__name"), slug=F("category__slug"))
+            .annotate(orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue"))
+            .order_by("-revenue", "category_id")
+        )
+        for category in categories:
+            category["revenue"] = money(category["revenue"])
+
+        return Response({
+            "date_from": params["date_from"],
+            "date_to": params["date_to"],
+            "categories": categories,
+        })
+
+
+#Top products over a date range, optionally within one category
+class TopProductsView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        params = range_params(TopProductsSerializer, request)
+        rows = DailyProductSales.objects.filter(date__range=(params["date_from"], params["date_to"]))
+        if "category" in params:
+            rows = rows.filter(product__category__slug=params["category"])
+
+        products = list(
+            rows.values("product_id", name=F("product__name"))
+            .annotate(orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue"))
+            .order_by("-revenue", "product_id")[:params["limit"]]
+        )
+        for product in products:
+            product["revenue"] = money(product["revenue"])
+
+        return Response({
+            "date_from": params["date_from"],
+            "date_to": params["date_to"],
+            "products": products,
+        })
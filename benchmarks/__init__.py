@@ -0,0 +1,10 @@
+"""
+Load-testing harness for the Ravoos Pansy API.
+
+Drives scripted user journeys against the app, either in-process
+(WSGI or ASGI, no server needed) or over HTTP against a running server,
+and records per-endpoint latency percentiles and throughput as JSON.
+
+    python -m benchmarks --scenario shopper --users 20 --concurrency 8
+    python -m benchmarks --target http://127.0.0.1:8000 --compare old.json
+"""
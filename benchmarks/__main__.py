@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from .scenarios import SCENARIOS, BenchmarkError
+from .stats import PERCENTILES, compare
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the API with scripted journeys")
+    parser.add_argument(
+        "--target", default="wsgi",
+        help="wsgi or asgi to run the app in-process, or a base URL such as http://127.0.0.1:8000",
+    )
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="shopper")
+    parser.add_argument("--users", type=int, default=8, help="Virtual users (default 8)")
+    parser.add_argument("--concurrency", type=int, help="Users running at once (default: --users)")
+    parser.add_argument("--iterations", type=int, default=5, help="Recorded journeys per user")
+    parser.add_argument("--warmup", type=int, default=1, help="Unrecorded journeys per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--slow-clients", type=int, default=0,
+        help="Connections that trickle requests at the server during the run (URL targets only)",
+    )
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to diff against")
+    return parser.parse_args(argv)
+
+
+def print_report(results, baseline=None):
+    header = f"{'endpoint':<34}{'count':>7}{'err':>5}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES) + f"{'req/s':>9}"
+    print(header)
+    for label, stats in results["endpoints"].items():
+        print(
+            f"{label:<34}{stats['count']:>7}{stats['errors']:>5}"
+            + "".join(f"{stats[f'p{p}_ms']:>10.1f}" for p in PERCENTILES)
+            + f"{stats['throughput_rps']:>9.1f}"
+        )
+    total = results["total"]
+    print(f"\n{total['requests']} requests, {total['errors']} errors in {total['duration_s']}s ({total['throughput_rps']} req/s)")
+
+    if baseline:
+        print(f"\np95 vs {baseline['meta'].get('commit') or 'baseline'}:")
+        for label, before, after, change in compare(baseline, results):
+            print(f"{label:<34}{before:>10.1f} -> {after:>8.1f} ms  {change:+.1f}%")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.target in ("wsgi", "asgi"):
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ravoos_pansy.settings")
+        import django
+        from django.conf import settings
+
+        django.setup()
+        # The in-process test clients always send Host: testserver
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+    from .runner import run
+
+    try:
+        results = run(
+            target=args.target,
+            scenario=args.scenario,
+            users=args.users,
+            concurrency=args.concurrency or args.users,
+            iterations=args.iterations,
+            warmup=args.warmup,
+            seed=args.seed,
+            slow_clients=args.slow_clients,
+        )
+    except BenchmarkError as exc:
+        sys.exit(str(exc))
+
+    output = args.output
+    if output is None:
+        stamp = results["meta"]["timestamp"].replace(":", "").replace("-", "")[:15]
+        output = RESULTS_DIR / f"{stamp}-{results['meta']['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, baseline)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
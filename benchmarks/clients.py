@@ -0,0 +1,141 @@
+"""
+Clients the scenarios talk through. Each one is used by a single worker
+thread, so none of them need locking.
+"""
+import asyncio
+import http.client
+import json
+from urllib.parse import urlsplit
+
+REQUEST_TIMEOUT = 10
+# Recorded for requests that never got a response
+CLIENT_ERROR_STATUS = 599
+
+class Result:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    @property
+    def ok(self):
+        return self.status < 400
+
+    def json(self):
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            # Error pages from the server or a proxy
+            return None
+
+
+class BaseClient:
+    def __init__(self, token=None):
+        self.token = token
+
+    def headers(self, extra=None):
+        headers = {}
+        if self.token:
+            headers["Authorization"] = f"Token {self.token}"
+        headers.update(extra or {})
+        return headers
+
+    def request(self, method, path, data=None, headers=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class WSGIClient(BaseClient):
+    """Calls the Django app directly through the test client's WSGI handler."""
+
+    def __init__(self, token=None):
+        super().__init__(token)
+        from django.test import Client
+
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method, path, data=None, headers=None):
+        response = self.client.generic(
+            method,
+            path,
+            json.dumps(data) if data is not None else "",
+            content_type="application/json",
+            headers=self.headers(headers),
+        )
+        return Result(response.status_code, b"".join(response) if response.streaming else response.content)
+
+
+class ASGIClient(BaseClient):
+    """Calls the Django app through the ASGI handler on a per-thread event loop."""
+
+    def __init__(self, token=None):
+        super().__init__(token)
+        from django.test import AsyncClient
+
+        self.client = AsyncClient(raise_request_exception=False)
+        self.loop = asyncio.new_event_loop()
+
+    def request(self, method, path, data=None, headers=None):
+        response = self.loop.run_until_complete(self.client.generic(
+            method,
+            path,
+            json.dumps(data) if data is not None else "",
+            content_type="application/json",
+            headers=self.headers(headers),
+        ))
+        if response.streaming:
+            body = self.loop.run_until_complete(self.read_stream(response))
+        else:
+            body = response.content
+        return Result(response.status_code, body)
+
+    @staticmethod
+    async def read_stream(response):
+        return b"".join([chunk async for chunk in response])
+
+    def close(self):
+        self.loop.close()
+
+
+class HTTPClient(BaseClient):
+    """Keep-alive HTTP/1.1 connection to a running server."""
+
+    def __init__(self, base_url, token=None):
+        super().__init__(token)
+        url = urlsplit(base_url)
+        self.prefix = url.path.rstrip("/")
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection_class(url.hostname, url.port, timeout=REQUEST_TIMEOUT)
+
+    def request(self, method, path, data=None, headers=None):
+        body = json.dumps(data) if data is not None else None
+        headers = self.headers(headers)
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        try:
+            try:
+                self.connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = self.connection.getresponse()
+            except (http.client.HTTPException, ConnectionError):
+                # The server dropped the keep-alive connection; retry once on a new one
+                self.connection.close()
+                self.connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = self.connection.getresponse()
+            return Result(response.status, response.read())
+        except (OSError, http.client.HTTPException):
+            # Timed out or refused: counted as an error, the run carries on
+            self.connection.close()
+            return Result(CLIENT_ERROR_STATUS, b"")
+
+    def close(self):
+        self.connection.close()
+
+
+def client_factory(target):
+    """Return a callable building a client for ``target``: wsgi, asgi or a URL."""
+    if target == "wsgi":
+        return WSGIClient
+    if target == "asgi":
+        return ASGIClient
+    return lambda token=None: HTTPClient(target, token)
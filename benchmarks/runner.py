@@ -0,0 +1,93 @@
+"""
+Runs a scenario with a fixed number of concurrent virtual users.
+"""
+import platform
+import random
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+from .clients import client_factory
+from .scenarios import SCENARIOS, BenchmarkError
+from .slow import SlowClients
+from .stats import summarize
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def database_vendor(target):
+    if target not in ("wsgi", "asgi"):
+        return None
+    from django.db import connection
+
+    return connection.vendor
+
+
+def run(target="wsgi", scenario="shopper", users=8, concurrency=8, iterations=5, warmup=1, seed=42,
+        slow_clients=0):
+    """
+    Run ``iterations`` journeys for each of ``users`` virtual users, at
+    most ``concurrency`` at a time, and return the results document.
+    Warm-up journeys run first and are not recorded. ``slow_clients``
+    connections trickle requests at the server for the whole run.
+    """
+    if slow_clients and target in ("wsgi", "asgi"):
+        raise BenchmarkError("--slow-clients needs a server URL as --target")
+
+    make_client = client_factory(target)
+    run_id = uuid.uuid4().hex[:8]
+    scenario_obj = SCENARIOS[scenario](make_client, run_id)
+    scenario_obj.check_catalog()
+
+    samples = []
+    recording = [False]
+
+    def record(label, seconds, status):
+        if recording[0]:
+            samples.append((label, seconds, status))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        virtual_users = list(pool.map(lambda index: scenario_obj.setup_user(index, record), range(users)))
+
+        def drive(index, count):
+            rng = random.Random(seed * 7919 + index)
+            for _ in range(count):
+                scenario_obj.journey(virtual_users[index], rng)
+
+        with SlowClients(target, slow_clients) if slow_clients else nullcontext():
+            list(pool.map(lambda index: drive(index, warmup), range(users)))
+
+            recording[0] = True
+            started = time.perf_counter()
+            list(pool.map(lambda index: drive(index, iterations), range(users)))
+            duration = time.perf_counter() - started
+            recording[0] = False
+
+        list(pool.map(lambda user: user.client.close(), virtual_users))
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "target": target,
+        "database": database_vendor(target),
+        "python": platform.python_version(),
+        "scenario": scenario,
+        "users": users,
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "warmup": warmup,
+        "seed": seed,
+        "slow_clients": slow_clients,
+    }
+    return {"meta": meta, **summarize(samples, duration)}
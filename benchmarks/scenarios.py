@@ -0,0 +1,147 @@
+"""
+Scripted user journeys.
+
+A scenario prepares one virtual user per worker slot (unmeasured) and
+then replays its journey repeatedly. Every request is recorded under a
+route label such as ``GET /api/products/{id}/`` so results group by
+endpoint rather than by concrete URL.
+"""
+import time
+import uuid
+from urllib.parse import quote
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class VirtualUser:
+    def __init__(self, client, record):
+        self.client = client
+        self.record = record
+        self.address_id = None
+
+    def call(self, label, method, path, data=None, headers=None):
+        started = time.perf_counter()
+        result = self.client.request(method, path, data, headers)
+        self.record(label, time.perf_counter() - started, result.status)
+        return result
+
+
+def results_of(payload):
+    """Product lists are plain lists, or ``{"next", "results"}`` when paginated."""
+    if isinstance(payload, dict):
+        return payload.get("results", [])
+    return payload or []
+
+
+class Browser:
+    """Anonymous catalog traffic: categories, paged listings, search, detail."""
+
+    name = "browser"
+    pages = 3
+
+    def __init__(self, make_client, run_id):
+        self.make_client = make_client
+        self.run_id = run_id
+
+    def check_catalog(self):
+        client = self.make_client()
+        try:
+            result = client.request("GET", "/api/products/?page_size=1")
+            if not result.ok or not results_of(result.json()):
+                raise BenchmarkError(
+                    "No products to benchmark against, run `python manage.py seed --scale 1` first"
+                )
+        finally:
+            client.close()
+
+    def setup_user(self, index, record):
+        return VirtualUser(self.make_client(), record)
+
+    def browse(self, user, rng):
+        categories = user.call("GET /api/categories/", "GET", "/api/categories/").json() or []
+
+        path = "/api/products/?page_size=20"
+        if categories:
+            path += f"&category={quote(rng.choice(categories)['slug'])}"
+
+        products = []
+        for _ in range(rng.randint(1, self.pages)):
+            payload = user.call("GET /api/products/?page_size", "GET", path).json()
+            products.extend(results_of(payload))
+            if not isinstance(payload, dict) or not payload.get("next"):
+                break
+            path = urlpath(payload["next"])
+
+        if not products:
+            products = results_of(user.call("GET /api/products/?page_size", "GET", "/api/products/?page_size=20").json())
+        if not products:
+            return []
+
+        product = rng.choice(products)
+        term = rng.choice(product["name"].split())
+        user.call("GET /api/products/?search", "GET", f"/api/products/?search={quote(term)}")
+        user.call("GET /api/products/{id}/", "GET", f"/api/products/{product['id']}/")
+        return products
+
+    def journey(self, user, rng):
+        self.browse(user, rng)
+
+
+class Shopper(Browser):
+    """Browse, fill the cart, check out and look at order history."""
+
+    name = "shopper"
+    password = "bench-password-123"
+
+    def setup_user(self, index, record):
+        client = self.make_client()
+        email = f"bench-{self.run_id}-{index}@bench.example.com"
+
+        signup = client.request("POST", "/api/auth/signup/", {
+            "email": email, "name": f"Bench User {index}", "password": self.password,
+        })
+        login = client.request("POST", "/api/auth/login/", {"email": email, "password": self.password})
+        if not (signup.ok and login.ok):
+            raise BenchmarkError(f"Could not create benchmark user {email}: {login.status} {login.body[:200]!r}")
+        client.close()
+
+        user = VirtualUser(self.make_client(login.json()["token"]), record)
+        address = user.client.request("POST", "/api/auth/addresses/", {
+            "full_name": f"Bench User {index}",
+            "phone": "9999999999",
+            "street": "1 Benchmark Road",
+            "city": "Hyderabad",
+            "state": "Telangana",
+            "pincode": "500001",
+            "is_default": True,
+        })
+        if not address.ok:
+            raise BenchmarkError(f"Could not create address: {address.status} {address.body[:200]!r}")
+        user.address_id = address.json()["id"]
+        return user
+
+    def journey(self, user, rng):
+        products = self.browse(user, rng)
+
+        for product in rng.sample(products, min(len(products), rng.randint(1, 3))):
+            user.call("POST /api/cart/add/", "POST", "/api/cart/add/", {
+                "product_id": product["id"], "quantity": rng.randint(1, 2),
+            }, headers={"Idempotency-Key": uuid.uuid4().hex})
+
+        user.call("GET /api/cart/", "GET", "/api/cart/")
+        user.call("POST /api/orders/checkout/", "POST", "/api/orders/checkout/", {
+            "address_id": user.address_id,
+        }, headers={"Idempotency-Key": uuid.uuid4().hex})
+        user.call("GET /api/orders/?page_size", "GET", "/api/orders/?page_size=10")
+
+
+def urlpath(url):
+    """Strip scheme and host from a pagination link."""
+    if "://" in url:
+        url = "/" + url.split("://", 1)[1].split("/", 1)[1]
+    return url
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (Browser, Shopper)}
@@ -0,0 +1,134 @@
+"""
+Microbenchmark: ModelSerializer vs the .values() fast path.
+
+Serializes the same rows both ways, checks the rendered JSON is identical
+and reports the best of several timings. No database is needed: the model
+instances and value dicts are built in memory, so only serialization is
+measured.
+
+    python -m benchmarks.serializers --rows 10000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+
+def product_rows(count):
+    from products.models import Category, Product
+
+    categories = [
+        Category(id=i, name=f"Category {i}", slug=f"category-{i}", theme="general")
+        for i in range(1, 21)
+    ]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    products, rows = [], []
+    for i in range(1, count + 1):
+        category = categories[i % len(categories)]
+        image = f"products/{i}.jpg" if i % 3 else ""
+        product = Product(
+            id=i,
+            name=f"Product {i}",
+            description="A reasonably long product description. " * 4,
+            price=Decimal(i % 9000 + 100) / 100,
+            category=category,
+            image=image,
+            created_at=start + timedelta(seconds=i),
+        )
+        products.append(product)
+        rows.append({
+            "id": product.id,
+            "name": product.name,
+            "description": product.description,
+            "price": product.price,
+            "category__id": category.id,
+            "category__name": category.name,
+            "category__slug": category.slug,
+            "category__theme": category.theme,
+            "image": image,
+        })
+    return products, rows
+
+
+def order_rows(count):
+    from orders.models import Order
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    orders, rows = [], []
+    for i in range(1, count + 1):
+        order = Order(
+            id=i, subtotal=Decimal("100.00"), gst=Decimal("5.00"), discount=Decimal("0.00"),
+            total=Decimal("105.00"), status="placed", created_at=start + timedelta(seconds=i),
+        )
+        orders.append(order)
+        rows.append({field: getattr(order, field) for field in (
+            "id", "subtotal", "gst", "discount", "total", "status", "created_at",
+        )})
+    return orders, rows
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure(name, serializer_class, fast, instances, rows, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    renderer = JSONRenderer()
+    slow_json = renderer.render(serializer_class(instances, many=True).data)
+    fast_json = renderer.render(fast.serialize(rows))
+    if slow_json != fast_json:
+        raise SystemExit(f"{name}: fast path output differs from {serializer_class.__name__}")
+
+    slow = best_of(repeat, lambda: serializer_class(instances, many=True).data)
+    quick = best_of(repeat, lambda: fast.serialize(rows))
+    return {"name": name, "rows": len(rows), "serializer_ms": slow * 1000, "values_ms": quick * 1000}
+
+
+def run(rows=10_000, repeat=5):
+    from orders.serializers import OrderSummarySerializer, order_summary_values
+    from products.serializers import ProductReadSerializer, product_values
+
+    products, product_dicts = product_rows(rows)
+    orders, order_dicts = order_rows(rows)
+    return [
+        measure("products", ProductReadSerializer, product_values, products, product_dicts, repeat),
+        measure("order summaries", OrderSummarySerializer, order_summary_values, orders, order_dicts, repeat),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.serializers",
+        description="Compare ModelSerializer with the .values() fast path",
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per path; the best one is reported")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ravoos_pansy.settings")
+    import django
+
+    django.setup()
+
+    print(f"{'':<18}{'rows':>8}{'serializer':>13}{'values':>10}{'speedup':>9}")
+    for result in run(args.rows, args.repeat):
+        print(
+            f"{result['name']:<18}{result['rows']:>8}"
+            f"{result['serializer_ms']:>11.1f}ms{result['values_ms']:>8.1f}ms"
+            f"{result['serializer_ms'] / result['values_ms']:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
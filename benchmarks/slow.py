@@ -0,0 +1,52 @@
+"""
+Slow clients: connections that send their request headers a few bytes at a
+time, the way clients on poor mobile networks do.
+
+A sync worker is stuck with such a connection until the request is
+complete; an async worker just waits on the socket. Running them next to
+a normal scenario shows how much throughput is lost to them.
+"""
+import socket
+import threading
+from urllib.parse import urlsplit
+
+
+class SlowClients:
+    def __init__(self, base_url, count, interval=0.5, path="/api/categories/"):
+        url = urlsplit(base_url)
+        self.address = (url.hostname, url.port or 80)
+        self.request = (
+            f"GET {url.path.rstrip('/')}{path} HTTP/1.1\r\n"
+            f"Host: {url.netloc}\r\n"
+        ).encode()
+        self.count = count
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.threads = []
+
+    def trickle(self):
+        # Reconnect whenever the server gives up on us, so the pressure
+        # stays constant for the whole run
+        while not self.stopped.is_set():
+            try:
+                with socket.create_connection(self.address, timeout=10) as sock:
+                    for byte in self.request:
+                        sock.sendall(bytes([byte]))
+                        if self.stopped.wait(self.interval):
+                            break
+                    while not self.stopped.wait(self.interval):
+                        sock.sendall(b"X-Slow: 1\r\n")
+            except OSError:
+                self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        for _ in range(self.count):
+            thread = threading.Thread(target=self.trickle, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join(timeout=5)
@@ -0,0 +1,62 @@
+"""
+Latency aggregation and run-to-run comparison.
+"""
+import math
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, duration):
+    """
+    Build per-endpoint stats from ``(label, seconds, status)`` samples
+    collected over ``duration`` seconds of wall-clock time.
+    """
+    by_label = {}
+    for label, seconds, status in samples:
+        by_label.setdefault(label, []).append((seconds, status))
+
+    endpoints = {}
+    for label, rows in sorted(by_label.items()):
+        latencies = sorted(seconds * 1000 for seconds, _ in rows)
+        stats = {
+            "count": len(rows),
+            "errors": sum(1 for _, status in rows if status >= 400),
+            "mean_ms": round(sum(latencies) / len(latencies), 3),
+        }
+        for pct in PERCENTILES:
+            stats[f"p{pct}_ms"] = round(percentile(latencies, pct), 3)
+        stats["max_ms"] = round(latencies[-1], 3)
+        stats["throughput_rps"] = round(len(rows) / duration, 2) if duration else 0.0
+        endpoints[label] = stats
+
+    requests = len(samples)
+    return {
+        "total": {
+            "requests": requests,
+            "errors": sum(stats["errors"] for stats in endpoints.values()),
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(requests / duration, 2) if duration else 0.0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare(baseline, current, metric="p95_ms"):
+    """Rows of (label, before, after, change %) for endpoints in both runs."""
+    rows = []
+    for label, stats in current["endpoints"].items():
+        before = baseline["endpoints"].get(label, {}).get(metric)
+        if before is None:
+            continue
+        after = stats[metric]
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((label, before, after, round(change, 1)))
+    return rows
@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase, SimpleTestCase, override_settings
+
+from products.models import Category, Product
+from .runner import run
+from . import serializers as serializer_benchmark
+from .stats import compare, percentile, summarize
+
+
+class StatsTests(SimpleTestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summarize_groups_by_label(self):
+        samples = [("GET /a", 0.010, 200), ("GET /a", 0.030, 200), ("POST /b", 0.020, 500)]
+        results = summarize(samples, duration=2.0)
+
+        self.assertEqual(results["total"], {
+            "requests": 3, "errors": 1, "duration_s": 2.0, "throughput_rps": 1.5,
+        })
+        self.assertEqual(results["endpoints"]["GET /a"]["count"], 2)
+        self.assertEqual(results["endpoints"]["GET /a"]["p50_ms"], 10.0)
+        self.assertEqual(results["endpoints"]["GET /a"]["p99_ms"], 30.0)
+        self.assertEqual(results["endpoints"]["POST /b"]["errors"], 1)
+
+    def test_compare_skips_new_endpoints(self):
+        baseline = {"endpoints": {"GET /a": {"p95_ms": 10.0}}}
+        current = {"endpoints": {"GET /a": {"p95_ms": 15.0}, "GET /b": {"p95_ms": 1.0}}}
+
+        self.assertEqual(compare(baseline, current), [("GET /a", 10.0, 15.0, 50.0)])
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class SerializerBenchmarkTests(SimpleTestCase):
+    def test_fast_path_matches_and_reports(self):
+        # run() exits if the two paths ever render differently
+        results = serializer_benchmark.run(rows=50, repeat=1)
+        self.assertEqual([result["name"] for result in results], ["products", "order summaries"])
+        for result in results:
+            self.assertEqual(result["rows"], 50)
+            self.assertGreater(result["values_ms"], 0)
+
+
+class InProcessRunTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        Product.objects.bulk_create(
+            Product(name=f"Burger {i}", price="120.00", category=category) for i in range(5)
+        )
+
+    def test_shopper_journey_runs_without_errors(self):
+        results = run(target="wsgi", scenario="shopper", users=1, concurrency=1, iterations=2)
+
+        self.assertEqual(results["total"]["errors"], 0)
+        self.assertEqual(results["meta"]["database"], "sqlite")
+        self.assertEqual(results["endpoints"]["POST /api/orders/checkout/"]["count"], 2)
+        for stats in results["endpoints"].values():
+            self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
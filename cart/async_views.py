@@ -0,0 +1,25 @@
+"""
+Async version of the cart read view, used when ASYNC_VIEWS is on.
+"""
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ravoos_pansy.async_views import AsyncAPIView
+from .serializers import cart_item_values
+from .views import cart_item_rows
+
+
+#Get Cart Items
+class CartListView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        if request.user.is_staff:
+            return Response(
+                {"error": "Admin cannot access cart"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        rows = [row async for row in cart_item_rows(request.user)]
+        return Response(cart_item_values.serialize(rows, request))
@@ -0,0 +1,75 @@
+from django.db import connection, models
+from django.utils import timezone
+
+
+class CartItemManager(models.Manager):
+
+    def add_quantity(self, user_id, product_id, quantity):
+        """
+        Add ``quantity`` of a product to a user's cart in a single statement.
+
+        INSERT ... ON CONFLICT (user_id, product_id) DO UPDATE lets the
+        database apply the increment atomically, so concurrent adds never
+        lose an update. The row is only written if the product exists and is
+        active; returns False otherwise.
+        """
+        from products.models import Product
+
+        qn = connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        product_table = qn(Product._meta.db_table)
+
+        sql = (
+            f"INSERT INTO {table} (user_id, product_id, quantity, added_at) "
+            f"SELECT %s, id, %s, %s FROM {product_table} "
+            f"WHERE id = %s AND is_active = %s "
+            f"ON CONFLICT (user_id, product_id) "
+            f"DO UPDATE SET quantity = {table}.quantity + excluded.quantity"
+        )
+        params = [user_id, quantity, timezone.now(), product_id, True]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount > 0
+
+    def add_quantities(self, user_id, quantities):
+        """
+        Bulk version of add_quantity for already validated products.
+
+        ``quantities`` maps product ids to the amount to add; all rows are
+        upserted with one multi-row INSERT ... ON CONFLICT statement.
+        """
+        if not quantities:
+            return
+
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        now = timezone.now()
+        rows = ", ".join(["(%s, %s, %s, %s)"] * len(quantities))
+        params = []
+        for product_id, quantity in quantities.items():
+            params += [user_id, product_id, quantity, now]
+
+        sql = (
+            f"INSERT INTO {table} (user_id, product_id, quantity, added_at) "
+            f"VALUES {rows} "
+            f"ON CONFLICT (user_id, product_id) "
+            f"DO UPDATE SET quantity = {table}.quantity + excluded.quantity"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def set_quantities(self, user_id, quantities):
+        """Set exact quantities, inserting rows that don't exist yet."""
+        if not quantities:
+            return
+
+        self.bulk_create(
+            [
+                self.model(user_id=user_id, product_id=product_id, quantity=quantity)
+                for product_id, quantity in quantities.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "product"],
+            update_fields=["quantity"],
+        )
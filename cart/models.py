@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.db import models
 from products.models import Product
+from .manager import CartItemManager
 
 User = settings.AUTH_USER_MODEL
 
@@ -17,6 +18,8 @@ class CartItem(models.Model):
     quantity = models.PositiveIntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CartItemManager()
+
     class Meta:
         unique_together = ("user", "product")
 
@@ -0,0 +1,67 @@
+"""
+Cart pricing shared by the cart summary and checkout, so the totals a
+user is shown are the totals they are charged.
+
+Every amount is rounded to the paisa, half up, before it is returned, so
+the summary shows exactly what the order stores.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce
+
+from coupons.redemption import check_coupon
+from .models import CartItem
+
+GST_RATE = Decimal("0.05")
+CENT = Decimal("0.01")
+
+
+def to_cents(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def cart_aggregates(user):
+    """Line count, unit count and subtotal of ``user``'s cart in one query."""
+    return CartItem.objects.filter(user=user).aggregate(
+        line_count=Count("id"),
+        item_count=Coalesce(Sum("quantity"), 0),
+        subtotal=Coalesce(
+            Sum(F("quantity") * F("product__price")),
+            Decimal("0"),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+def lines_subtotal(items):
+    """Subtotal of cart items already loaded with their products."""
+    return sum(
+        (item.product.price * item.quantity for item in items),
+        Decimal("0"),
+    )
+
+
+def price_cart(subtotal, coupon_code=None):
+    """
+    GST, coupon discount and total for a cart subtotal.
+
+    Returns ``(coupon, totals)``; coupon is None when no code was given.
+    Raises CouponRejected for a code that doesn't apply.
+    """
+    coupon = None
+    discount = Decimal("0")
+    if coupon_code:
+        coupon, discount = check_coupon(coupon_code, subtotal)
+
+    subtotal = to_cents(subtotal)
+    gst = to_cents(subtotal * GST_RATE)
+    discount = to_cents(discount)
+    total = max(subtotal + gst - discount, to_cents(Decimal("0")))
+
+    return coupon, {
+        "subtotal": subtotal,
+        "gst": gst,
+        "discount": discount,
+        "total": total,
+    }
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import CartItem
 from products.serializers import ProductReadSerializer, ProductWriteSerializer
+from ravoos_pansy.fast_serializers import ValuesSerializer
+
+MAX_BATCH_OPERATIONS = 100
 
 class CartItemSerializer(serializers.ModelSerializer):
     product = ProductReadSerializer(read_only=True)
@@ -12,3 +15,29 @@ class CartItemSerializer(serializers.ModelSerializer):
             "product",
             "quantity"
         ]
+
+
+#Fast read path for the cart list (same output as CartItemSerializer)
+cart_item_values = ValuesSerializer(CartItemSerializer)
+
+
+#Batch cart operations
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=["add", "update", "remove"])
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, data):
+        if data["op"] == "add":
+            data.setdefault("quantity", 1)
+            if data["quantity"] <= 0:
+                raise serializers.ValidationError({"quantity": "Must be positive for add"})
+        elif data["op"] == "update" and "quantity" not in data:
+            raise serializers.ValidationError({"quantity": "This field is required for update"})
+        return data
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(
+        many=True, allow_empty=False, max_length=MAX_BATCH_OPERATIONS
+    )
@@ -1,3 +1,341 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from coupons.models import Coupon
+from products.models import Category, Product
+from ravoos_pansy.testing import QueryBudgetMixin
+from users.models import Address, User
+from . import async_views, views
+from .models import CartItem
+from .pricing import price_cart
+
+
+class CartTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("buyer@example.com", "Buyer")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name="Food", slug="food", theme="food")
+        self.product = Product.objects.create(name="Burger", price="120.00", category=self.category)
+
+    def add(self, product_id, quantity=1, headers=None):
+        return self.client.post(
+            "/api/cart/add/", {"product_id": product_id, "quantity": quantity}, headers=headers
+        )
+
+    def quantity(self, product=None):
+        return CartItem.objects.get(user=self.user, product=product or self.product).quantity
+
+
+class AddToCartIdempotencyTests(CartTestCase):
+    def test_retry_does_not_increment_twice(self):
+        self.add(self.product.pk, 2, headers={"Idempotency-Key": "tap-1"})
+        retry = self.add(self.product.pk, 2, headers={"Idempotency-Key": "tap-1"})
+
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(self.quantity(), 2)
+
+    def test_new_key_increments(self):
+        self.add(self.product.pk, 2, headers={"Idempotency-Key": "tap-1"})
+        self.add(self.product.pk, 2, headers={"Idempotency-Key": "tap-2"})
+        self.assertEqual(self.quantity(), 4)
+
+    def test_without_key_every_request_counts(self):
+        self.add(self.product.pk)
+        self.add(self.product.pk)
+        self.assertEqual(self.quantity(), 2)
+
+
+class AddToCartUpsertTests(CartTestCase):
+    def test_single_statement(self):
+        with self.assertNumQueries(1):
+            response = self.add(self.product.pk, 3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantity(), 3)
+
+        with self.assertNumQueries(1):
+            self.add(self.product.pk, 2)
+        self.assertEqual(self.quantity(), 5)
+
+    def test_inactive_or_missing_product(self):
+        inactive = Product.objects.create(
+            name="Old", price="1.00", category=self.category, is_active=False
+        )
+        self.assertEqual(self.add(inactive.pk).status_code, 404)
+        self.assertEqual(self.add(999999).status_code, 404)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_invalid_quantity(self):
+        self.assertEqual(self.add(self.product.pk, 0).status_code, 400)
+        self.assertEqual(self.add(self.product.pk, "lots").status_code, 400)
+
+
+class CartBatchTests(CartTestCase):
+    def setUp(self):
+        super().setUp()
+        self.products = Product.objects.bulk_create(
+            Product(name=f"Item {i}", price="10.00", category=self.category)
+            for i in range(40)
+        )
+
+    def batch(self, operations):
+        return self.client.post("/api/cart/batch/", {"operations": operations}, format="json")
+
+    def test_applies_operations_and_returns_cart(self):
+        CartItem.objects.create(user=self.user, product=self.products[0], quantity=5)
+        CartItem.objects.create(user=self.user, product=self.products[1], quantity=5)
+
+        response = self.batch([
+            {"op": "add", "product_id": self.products[0].pk, "quantity": 2},
+            {"op": "update", "product_id": self.products[1].pk, "quantity": 1},
+            {"op": "add", "product_id": self.products[2].pk},
+            {"op": "remove", "product_id": self.product.pk},
+        ])
+        self.assertEqual(response.status_code, 200)
+        quantities = {item["product"]["id"]: item["quantity"] for item in response.data}
+        self.assertEqual(quantities, {
+            self.products[0].pk: 7,
+            self.products[1].pk: 1,
+            self.products[2].pk: 1,
+        })
+
+    def test_operations_apply_in_order(self):
+        pid = self.products[0].pk
+        self.batch([
+            {"op": "add", "product_id": pid, "quantity": 2},
+            {"op": "add", "product_id": pid, "quantity": 3},
+        ])
+        self.assertEqual(self.quantity(self.products[0]), 5)
+
+        self.batch([
+            {"op": "remove", "product_id": pid},
+            {"op": "add", "product_id": pid, "quantity": 4},
+        ])
+        self.assertEqual(self.quantity(self.products[0]), 4)
+
+        self.batch([{"op": "update", "product_id": pid, "quantity": 0}])
+        self.assertFalse(CartItem.objects.filter(product_id=pid).exists())
+
+    def test_query_count_is_independent_of_batch_size(self):
+        counts = []
+        for products in (self.products[:2], self.products[2:]):
+            operations = [
+                {"op": op, "product_id": product.pk, "quantity": 2}
+                for product in products
+                for op in ("add", "update")
+            ] + [{"op": "remove", "product_id": self.product.pk}]
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.batch(operations).status_code, 200)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_invalid_product_rejects_whole_batch(self):
+        response = self.batch([
+            {"op": "add", "product_id": self.products[0].pk},
+            {"op": "add", "product_id": 999999},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_validation(self):
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.batch([{"op": "update", "product_id": 1}]).status_code, 400)
+        self.assertEqual(self.batch([{"op": "explode", "product_id": 1}]).status_code, 400)
+
+
+class CartListTests(CartTestCase):
+    def test_query_count_is_constant(self):
+        products = Product.objects.bulk_create(
+            Product(name=f"Item {i}", price="10.00", category=self.category)
+            for i in range(20)
+        )
+        CartItem.objects.bulk_create(
+            CartItem(user=self.user, product=product) for product in products
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/cart/")
+        self.assertEqual(len(response.json()), 20)
+
+
+class CartSummaryTests(CartTestCase):
+    def setUp(self):
+        super().setUp()
+        self.fries = Product.objects.create(name="Fries", price="45.50", category=self.category)
+        self.add(self.product.pk, 2)
+        self.add(self.fries.pk, 3)
+
+    def test_totals_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/cart/summary/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["line_count"], 2)
+        self.assertEqual(response.data["item_count"], 5)
+        self.assertEqual(response.data["subtotal"], Decimal("376.50"))
+        self.assertEqual(response.data["gst"], Decimal("18.83"))
+        self.assertEqual(response.data["discount"], 0)
+        self.assertEqual(response.data["total"], Decimal("395.33"))
+
+    def test_amounts_are_rounded_half_up_to_the_paisa(self):
+        Coupon.objects.create(code="THIRD", percent_off="33")
+        _, totals = price_cart(Decimal("99.99"), "THIRD")
+        self.assertEqual(totals["gst"], Decimal("5.00"))
+        self.assertEqual(totals["discount"], Decimal("33.00"))
+        self.assertEqual(totals["total"], Decimal("71.99"))
+        for amount in totals.values():
+            self.assertEqual(amount.as_tuple().exponent, -2)
+
+    def test_empty_cart(self):
+        CartItem.objects.all().delete()
+        response = self.client.get("/api/cart/summary/")
+        self.assertEqual(response.data["item_count"], 0)
+        self.assertEqual(response.data["total"], 0)
+
+    def test_matches_checkout(self):
+        Coupon.objects.create(code="TEN", percent_off="10")
+        summary = self.client.get("/api/cart/summary/", {"coupon": "TEN"}).data
+
+        address = Address.objects.create(
+            user=self.user, full_name="Buyer", phone="1234567890", street="1 Main St",
+            city="City", state="State", pincode="123456",
+        )
+        order = self.client.post(
+            "/api/orders/checkout/", {"address_id": address.pk, "coupon": "TEN"}
+        ).data
+        for field in ("subtotal", "gst", "discount", "total"):
+            self.assertEqual(summary[field], order[field], field)
+
+    def test_rejected_coupon_keeps_totals(self):
+        Coupon.objects.create(code="BIG", discount_amount="50", min_cart_value="1000")
+        response = self.client.get("/api/cart/summary/", {"coupon": "BIG"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["discount"], 0)
+        self.assertEqual(response.data["coupon_error"], "Coupon needs a cart value of at least 1000.00")
+
+    def test_admin_forbidden(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get("/api/cart/summary/").status_code, 403)
+
+
+class AsyncCartListTests(CartTestCase):
+    def responses(self, user=None):
+        factory = APIRequestFactory()
+        requests = [factory.get("/api/cart/"), factory.get("/api/cart/")]
+        if user:
+            for request in requests:
+                force_authenticate(request, user=user)
+
+        sync = views.CartListView.as_view()(requests[0]).render()
+        response = async_to_sync(async_views.CartListView.as_view())(requests[1])
+        return sync, response
+
+    def test_matches_sync_view(self):
+        self.add(self.product.pk, 2)
+        admin = User.objects.create_user("admin@example.com", "Admin")
+        admin.is_staff = True
+        admin.save()
+
+        for user in (self.user, admin, None):
+            with self.subTest(user=user):
+                sync, response = self.responses(user)
+                self.assertEqual(response.status_code, sync.status_code)
+                self.assertEqual(response.content, sync.content)
+                self.assertEqual(response.get("WWW-Authenticate"), sync.get("WWW-Authenticate"))
+
+
+class CartQueryBudgetTests(QueryBudgetMixin, CartTestCase):
+    urlconf = "cart.urls"
+    budgets = {
+        ("GET", ""): 1,
+        ("GET", "summary/"): 2,  # plus loading the coupon cache
+        ("POST", "add/"): 1,
+        ("PUT", "update/"): 2,
+        ("DELETE", "remove/<int:pk>/"): 2,
+        ("DELETE", "clear/"): 1,
+        ("POST", "batch/"): 7,  # includes the savepoint pair
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.products = Product.objects.bulk_create(
+            Product(name=f"Item {i}", price="10.00", category=self.category)
+            for i in range(200)
+        )
+        CartItem.objects.bulk_create(
+            CartItem(user=self.user, product=product, quantity=2)
+            for product in self.products[:50]
+        )
+        self.item = CartItem.objects.filter(user=self.user).first()
+
+    def test_list(self):
+        response = self.assertWithinBudget("GET", "", "/api/cart/")
+        self.assertEqual(len(response.json()), 50)
+
+    def test_summary(self):
+        Coupon.objects.create(code="TEN", percent_off="10")
+        response = self.assertWithinBudget(
+            "GET", "summary/", "/api/cart/summary/", data={"coupon": "TEN"}
+        )
+        self.assertEqual(response.data["item_count"], 100)
+
+    def test_add(self):
+        self.assertWithinBudget(
+            "POST", "add/", "/api/cart/add/", data={"product_id": self.products[60].pk}
+        )
+
+    def test_update(self):
+        self.assertWithinBudget(
+            "PUT", "update/", "/api/cart/update/",
+            data={"item_id": self.item.pk, "quantity": 5},
+        )
+
+    def test_remove(self):
+        self.assertWithinBudget(
+            "DELETE", "remove/<int:pk>/", f"/api/cart/remove/{self.item.pk}/"
+        )
+
+    def test_clear(self):
+        self.assertWithinBudget("DELETE", "clear/", "/api/cart/clear/")
+
+    def test_batch(self):
+        operations = (
+            [{"op": "add", "product_id": p.pk} for p in self.products[50:150]][:40]
+            + [{"op": "update", "product_id": p.pk, "quantity": 3} for p in self.products[:30]]
+            + [{"op": "remove", "product_id": p.pk} for p in self.products[30:50]]
+        )
+        self.assertWithinBudget(
+            "POST", "batch/", "/api/cart/batch/",
+            data={"operations": operations}, format="json",
+        )
+
+
+class ConcurrentAddToCartTests(TransactionTestCase):
+    workers = 8
+    adds_per_worker = 25
+
+    def test_no_lost_increments(self):
+        user = User.objects.create_user("buyer@example.com", "Buyer")
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        product = Product.objects.create(name="Burger", price="120.00", category=category)
+
+        def hammer(_):
+            try:
+                for _ in range(self.adds_per_worker):
+                    CartItem.objects.add_quantity(user.id, product.id, 1)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(hammer, range(self.workers)))
+
+        item = CartItem.objects.get(user=user, product=product)
+        self.assertEqual(item.quantity, self.workers * self.adds_per_worker)
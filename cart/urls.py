@@ -1,16 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     CartListView,
+    CartSummaryView,
     AddToCartView,
     UpdateCartItemView,
     RemoveCartItemView,
     ClearCartView,
+    CartBatchView,
 )
 
+if settings.ASYNC_VIEWS:
+    from .async_views import CartListView
+
 urlpatterns = [
     path("", CartListView.as_view()),
+    path("summary/", CartSummaryView.as_view()),
     path("add/", AddToCartView.as_view()),
     path("update/", UpdateCartItemView.as_view()),
     path("remove/<int:pk>/", RemoveCartItemView.as_view()),
     path("clear/", ClearCartView.as_view()),
+    path("batch/", CartBatchView.as_view()),
 ]
@@ -1,10 +1,24 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
 from products.models import Product
 from .models import CartItem
-from .serializers import CartItemSerializer
+from .serializers import CartItemSerializer, CartBatchSerializer, cart_item_values
 from rest_framework import status
+from coupons.redemption import CouponRejected
+from ravoos_pansy.idempotency import idempotent
+from .pricing import cart_aggregates, price_cart
+
+def cart_items_for(user):
+    # Products and their categories are nested in CartItemSerializer
+    return CartItem.objects.filter(user=user).select_related("product__category")
+
+
+def cart_item_rows(user):
+    # The same items as plain rows for cart_item_values (one joined query)
+    return cart_item_values.values(CartItem.objects.filter(user=user))
+
 
 #Get Cart Items
 class CartListView(APIView):
@@ -17,15 +31,44 @@ class CartListView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        items = CartItem.objects.filter(user=request.user)
-        serializer = CartItemSerializer(items, many=True)
-        return Response(serializer.data)
+        return Response(cart_item_values.serialize(cart_item_rows(request.user), request))
+
+
+#Cart Totals (no product payloads)
+class CartSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.is_staff:
+            return Response(
+                {"error": "Admin cannot access cart"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        aggregates = cart_aggregates(request.user)
+        coupon_code = request.query_params.get("coupon")
+
+        summary = {
+            "line_count": aggregates["line_count"],
+            "item_count": aggregates["item_count"],
+            "coupon": coupon_code,
+        }
+        try:
+            coupon, totals = price_cart(aggregates["subtotal"], coupon_code)
+        except CouponRejected as exc:
+            # Still show the totals, just without the discount
+            coupon, totals = price_cart(aggregates["subtotal"])
+            summary["coupon_error"] = str(exc)
+
+        summary.update(totals)
+        return Response(summary)
 
 
 #Add to Cart
 class AddToCartView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         if request.user.is_staff:
             return Response(
@@ -34,23 +77,29 @@ class AddToCartView(APIView):
             )
 
         product_id = request.data.get("product_id")
-        quantity = int(request.data.get("quantity", 1))
 
         try:
-            product = Product.objects.get(id=product_id, is_active=True)
-        except Product.DoesNotExist:
+            quantity = int(request.data.get("quantity", 1))
+            product_id = int(product_id)
+        except (TypeError, ValueError):
             return Response(
-                {"error": "Product not found"},
-                status=status.HTTP_404_NOT_FOUND
+                {"error": "product_id and quantity must be numbers"},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-        cart_item, created = CartItem.objects.get_or_create(
-            user=request.user,
-            product=product
-        )
+        if quantity <= 0:
+            return Response(
+                {"error": "Quantity must be positive"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        cart_item.quantity = cart_item.quantity + quantity if not created else quantity
-        cart_item.save()
+        # One upsert: validates the product and increments atomically
+        added = CartItem.objects.add_quantity(request.user.id, product_id, quantity)
+        if not added:
+            return Response(
+                {"error": "Product not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         return Response(
             {"message": "Added to cart"},
@@ -156,3 +205,72 @@ class ClearCartView(APIView):
             status=status.HTTP_200_OK
         )
 
+
+def fold_operations(operations):
+    """
+    Collapse a list of cart operations into one final action per product.
+
+    Operations are applied in order, so e.g. remove followed by add leaves
+    exactly the added quantity, and add followed by add sums both.
+    """
+    actions = {}
+    for operation in operations:
+        product_id = operation["product_id"]
+        op = operation["op"]
+
+        if op == "add":
+            action, quantity = actions.get(product_id, ("add", 0))
+            if action == "remove":
+                actions[product_id] = ("update", operation["quantity"])
+            else:
+                actions[product_id] = (action, quantity + operation["quantity"])
+        elif op == "update" and operation["quantity"] > 0:
+            actions[product_id] = ("update", operation["quantity"])
+        else:
+            # Updating to 0 removes the item, like UpdateCartItemView
+            actions[product_id] = ("remove", 0)
+    return actions
+
+
+#Batch add / update / remove (e.g. merging a guest cart on login)
+class CartBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        if request.user.is_staff:
+            return Response(
+                {"error": "Admin cannot update cart"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data["operations"]
+        actions = fold_operations(operations)
+
+        # Validate every product up front with one lookup
+        wanted = {pid for pid, (action, _) in actions.items() if action != "remove"}
+        found = set(
+            Product.objects.filter(id__in=wanted, is_active=True).values_list("id", flat=True)
+        )
+        errors = [
+            {"index": index, "product_id": operation["product_id"], "error": "Product not found"}
+            for index, operation in enumerate(operations)
+            if operation["product_id"] in wanted - found
+        ]
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        adds = {pid: qty for pid, (action, qty) in actions.items() if action == "add"}
+        updates = {pid: qty for pid, (action, qty) in actions.items() if action == "update"}
+        removes = [pid for pid, (action, _) in actions.items() if action == "remove"]
+
+        with transaction.atomic():
+            CartItem.objects.add_quantities(request.user.id, adds)
+            CartItem.objects.set_quantities(request.user.id, updates)
+            if removes:
+                CartItem.objects.filter(user=request.user, product_id__in=removes).delete()
+
+        serializer = CartItemSerializer(cart_items_for(request.user), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
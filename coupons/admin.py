@@ -1,3 +1,13 @@
 from django.contrib import admin
+from .models import Coupon, CouponRedemption
 
-# Register your models here.
+@admin.register(Coupon)
+class CouponAdmin(admin.ModelAdmin):
+    list_display = ("code", "discount_amount", "percent_off", "is_active", "valid_to", "used_count", "usage_limit")
+    list_filter = ("is_active",)
+    readonly_fields = ("used_count",)
+
+@admin.register(CouponRedemption)
+class CouponRedemptionAdmin(admin.ModelAdmin):
+    list_display = ("coupon", "user", "order", "created_at")
+    raw_id_fields = ("user", "order")
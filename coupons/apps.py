@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CouponsConfig(AppConfig):
     name = 'coupons'
+
+    def ready(self):
+        from . import signals  # noqa: F401
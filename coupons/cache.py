@@ -0,0 +1,71 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Coupon
+
+GENERATION_KEY = "coupons:generation"
+
+
+def shared_cache():
+    return caches[settings.COUPON_CACHE_ALIAS]
+
+
+def get_generation():
+    cache = shared_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Make every process reload its active coupons on the next lookup."""
+    cache = shared_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        get_generation()
+
+
+class ActiveCoupons:
+    """
+    Per-process copy of every active coupon, keyed by code.
+
+    The table is small and read on every checkout and preview, so it is
+    loaded whole in one query and reused until the shared generation
+    counter moves (any coupon save or delete, or a redemption of a coupon
+    with a global limit). A lookup, including one for an unknown code,
+    then costs a cache read instead of a database query.
+    """
+
+    def __init__(self):
+        self._generation = None
+        self._coupons = {}
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        generation = get_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._coupons = {
+                    coupon.code: coupon for coupon in Coupon.objects.filter(is_active=True)
+                }
+                self._generation = generation
+            return self._coupons.get(code)
+
+    def clear(self):
+        with self._lock:
+            self._generation = None
+            self._coupons = {}
+
+
+active_coupons = ActiveCoupons()
+
+
+def get_active_coupon(code):
+    """Active coupon for ``code``, or None. Treat the result as read-only."""
+    return active_coupons.get(code)
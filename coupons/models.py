@@ -1,10 +1,83 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+CENT = Decimal("0.01")
+
+
 class Coupon(models.Model):
     code = models.CharField(max_length=20, unique=True)
-    discount_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Takes precedence over discount_amount when set
+    percent_off = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+    )
+    min_cart_value = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     is_active = models.BooleanField(default=True)
+    valid_from = models.DateTimeField(null=True, blank=True)
+    valid_to = models.DateTimeField(null=True, blank=True)
+
+    # Usage limits (None = unlimited). used_count is only ever changed by a
+    # conditional UPDATE at checkout, never through save() (see below).
+    usage_limit = models.PositiveIntegerField(null=True, blank=True)
+    per_user_limit = models.PositiveIntegerField(null=True, blank=True)
+    used_count = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        # An instance loaded before a checkout holds a stale used_count;
+        # saving it (e.g. from the admin) must not write it back
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "used_count"
+            ]
+        super().save(*args, **kwargs)
+
+    def discount_for(self, subtotal):
+        if self.percent_off is not None:
+            return (subtotal * self.percent_off / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+        return self.discount_amount
+
     def __str__(self):
+        if self.percent_off is not None:
+            return f"{self.code} - {self.percent_off}%"
         return f"{self.code} - ₹{self.discount_amount}"
+
+
+class CouponRedemption(models.Model):
+    coupon = models.ForeignKey(
+        Coupon,
+        on_delete=models.CASCADE,
+        related_name="redemptions"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="coupon_redemptions"
+    )
+    # Kept when the order is deleted, so deleting old orders doesn't free
+    # up per-user uses
+    order = models.OneToOneField(
+        "orders.Order",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="coupon_redemption"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Per-user limit check at checkout
+            models.Index(fields=["coupon", "user"], name="redemption_coupon_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.coupon.code} - {self.user}"
@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import bump_generation, get_active_coupon
+from .models import Coupon, CouponRedemption
+
+
+class CouponRejected(Exception):
+    pass
+
+
+def check_coupon(code, subtotal, user=None):
+    """
+    Look up ``code`` and check it against ``subtotal``.
+
+    Everything but the per-user limit is answered from the in-process
+    coupon cache. The global usage count there may trail the database, so
+    a pass here is a preview: redeem_coupon() decides for real. Returns the
+    coupon and its discount, or raises CouponRejected.
+    """
+    coupon = get_active_coupon(code)
+    if coupon is None:
+        raise CouponRejected("Invalid coupon")
+
+    now = timezone.now()
+    if coupon.valid_from is not None and now < coupon.valid_from:
+        raise CouponRejected("Coupon is not active yet")
+    if coupon.valid_to is not None and now >= coupon.valid_to:
+        raise CouponRejected("Coupon has expired")
+    if subtotal < coupon.min_cart_value:
+        raise CouponRejected(f"Coupon needs a cart value of at least {coupon.min_cart_value}")
+    if coupon.usage_limit is not None and coupon.used_count >= coupon.usage_limit:
+        raise CouponRejected("Coupon usage limit reached")
+    if user is not None and coupon.per_user_limit is not None:
+        used = CouponRedemption.objects.filter(coupon=coupon, user=user).count()
+        if used >= coupon.per_user_limit:
+            raise CouponRejected("You have already used this coupon")
+
+    return coupon, coupon.discount_for(subtotal)
+
+
+def redeem_coupon(coupon, user, order):
+    """
+    Count one use of ``coupon`` for ``order``; call inside the checkout
+    transaction.
+
+    The used_count increment is a conditional UPDATE, so the global limit
+    holds under any concurrency. The UPDATE also locks the coupon row until
+    commit, which serializes redemptions of the same coupon and makes the
+    per-user count that follows it safe. Raises CouponRejected, which must
+    roll back the surrounding transaction.
+    """
+    within_limit = Q(usage_limit__isnull=True) | Q(used_count__lt=F("usage_limit"))
+    updated = Coupon.objects.filter(within_limit, pk=coupon.pk, is_active=True).update(
+        used_count=F("used_count") + 1
+    )
+    if not updated:
+        # The cached copy let an exhausted (or just deactivated) coupon
+        # through. The checkout rolls back, so refresh the caches now.
+        bump_generation()
+        raise CouponRejected("Coupon usage limit reached")
+
+    if coupon.per_user_limit is not None:
+        used = CouponRedemption.objects.filter(coupon=coupon, user=user).count()
+        if used >= coupon.per_user_limit:
+            raise CouponRejected("You have already used this coupon")
+
+    CouponRedemption.objects.create(coupon=coupon, user=user, order=order)
+
+    if coupon.usage_limit is not None:
+        # Let other processes see the new count in their previews
+        transaction.on_commit(bump_generation)
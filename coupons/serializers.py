@@ -0,0 +1,7 @@
+from rest_framework import serializers
+
+
+#Validate (preview) request
+class CouponValidateSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=20)
+    subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
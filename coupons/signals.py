@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .models import Coupon
+
+
+@receiver([post_save, post_delete], sender=Coupon)
+def invalidate_coupon_cache(sender, **kwargs):
+    # Bump after commit so a concurrent lookup can't reload the old rows
+    # under the new generation
+    transaction.on_commit(bump_generation)
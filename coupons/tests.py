@@ -1,3 +1,184 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import CartItem
+from orders.models import Order
+from products.models import Category, Product
+from ravoos_pansy.testing import QueryBudgetMixin
+from users.models import Address, User
+from .models import Coupon, CouponRedemption
+
+
+class CouponTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("buyer@example.com", "Buyer")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def validate(self, code, subtotal="500.00"):
+        return self.client.post("/api/coupons/validate/", {"code": code, "subtotal": subtotal})
+
+
+class CouponValidateTests(CouponTestCase):
+    def test_flat_discount(self):
+        Coupon.objects.create(code="FLAT50", discount_amount="50.00")
+        response = self.validate("FLAT50")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["valid"])
+        self.assertEqual(response.data["discount"], Decimal("50.00"))
+
+    def test_percent_discount(self):
+        Coupon.objects.create(code="TEN", percent_off="10")
+        response = self.validate("TEN", subtotal="333.33")
+        self.assertEqual(response.data["discount"], Decimal("33.33"))
+
+    def test_rules(self):
+        now = timezone.now()
+        Coupon.objects.create(code="MIN", discount_amount="10", min_cart_value="1000")
+        Coupon.objects.create(code="OLD", discount_amount="10", valid_to=now - timedelta(days=1))
+        Coupon.objects.create(code="SOON", discount_amount="10", valid_from=now + timedelta(days=1))
+        Coupon.objects.create(code="USED", discount_amount="10", usage_limit=5, used_count=5)
+        Coupon.objects.create(code="OFF", discount_amount="10", is_active=False)
+
+        for code, error in [
+            ("MIN", "Coupon needs a cart value of at least 1000.00"),
+            ("OLD", "Coupon has expired"),
+            ("SOON", "Coupon is not active yet"),
+            ("USED", "Coupon usage limit reached"),
+            ("OFF", "Invalid coupon"),
+            ("NOPE", "Invalid coupon"),
+        ]:
+            response = self.validate(code)
+            self.assertEqual(response.status_code, 400, code)
+            self.assertEqual(response.data, {"valid": False, "error": error})
+
+    def test_warm_lookups_do_not_query(self):
+        Coupon.objects.create(code="TEN", percent_off="10")
+        self.validate("TEN")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.validate("TEN").status_code, 200)
+            self.assertEqual(self.validate("NOPE").status_code, 400)
+
+    def test_save_invalidates_cached_coupons(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            coupon = Coupon.objects.create(code="TEN", percent_off="10")
+        self.assertEqual(self.validate("TEN").status_code, 200)
+
+        coupon.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            coupon.save()
+        self.assertEqual(self.validate("TEN").status_code, 400)
+
+    def test_cache_is_per_generation(self):
+        Coupon.objects.create(code="TEN", percent_off="10")
+        self.validate("TEN")
+        # Another process saw the save: only the shared counter moved
+        Coupon.objects.filter(code="TEN").update(is_active=False)
+        self.assertEqual(self.validate("TEN").status_code, 200)
+        cache.clear()
+        self.assertEqual(self.validate("TEN").status_code, 400)
+
+
+class CouponCheckoutTests(CouponTestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        self.product = Product.objects.create(name="Rice", price="100.00", category=category)
+        self.address = Address.objects.create(
+            user=self.user, full_name="Buyer", phone="1234567890", street="1 Main St",
+            city="City", state="State", pincode="123456",
+        )
+
+    def checkout(self, user, coupon):
+        CartItem.objects.create(user=user, product=self.product, quantity=2)
+        address = Address.objects.filter(user=user).first() or Address.objects.create(
+            user=user, full_name="Buyer", phone="1234567890", street="1 Main St",
+            city="City", state="State", pincode="123456",
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client.post(
+            "/api/orders/checkout/", {"address_id": address.pk, "coupon": coupon}
+        )
+
+    def test_percent_coupon_is_applied_and_redeemed(self):
+        coupon = Coupon.objects.create(code="TEN", percent_off="10")
+        response = self.checkout(self.user, "TEN")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["discount"], Decimal("20.00"))
+        self.assertEqual(response.data["total"], Decimal("190.00"))
+
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+        redemption = CouponRedemption.objects.get()
+        self.assertEqual(redemption.order_id, response.data["order_id"])
+
+    def test_global_limit(self):
+        coupon = Coupon.objects.create(code="ONCE", discount_amount="10", usage_limit=1)
+        other = User.objects.create_user("other@example.com", "Other")
+        self.assertEqual(self.checkout(self.user, "ONCE").status_code, 200)
+
+        # The cached copy still says 0 uses; the UPDATE guard decides
+        response = self.checkout(other, "ONCE")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "Coupon usage limit reached"})
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+        self.assertEqual(Order.objects.filter(user=other).count(), 0)
+        self.assertTrue(CartItem.objects.filter(user=other).exists())
+
+    def test_per_user_limit(self):
+        coupon = Coupon.objects.create(code="ONEEACH", discount_amount="10", per_user_limit=1)
+        self.assertEqual(self.checkout(self.user, "ONEEACH").status_code, 200)
+
+        response = self.checkout(self.user, "ONEEACH")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "You have already used this coupon"})
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+        self.assertEqual(self.validate("ONEEACH").status_code, 400)
+
+        other = User.objects.create_user("other@example.com", "Other")
+        self.assertEqual(self.checkout(other, "ONEEACH").status_code, 200)
+
+    def test_save_keeps_used_count(self):
+        coupon = Coupon.objects.create(code="TEN", percent_off="10", usage_limit=5)
+        self.assertEqual(self.checkout(self.user, "TEN").status_code, 200)
+
+        # Loaded before the checkout, as an open admin form would be
+        coupon.usage_limit = 10
+        coupon.save()
+        coupon.refresh_from_db()
+        self.assertEqual((coupon.used_count, coupon.usage_limit), (1, 10))
+
+    def test_min_cart_value_uses_checkout_subtotal(self):
+        Coupon.objects.create(code="BIG", discount_amount="10", min_cart_value="500")
+        response = self.checkout(self.user, "BIG")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.count(), 0)
+
+
+class CouponQueryBudgetTests(QueryBudgetMixin, CouponTestCase):
+    urlconf = "coupons.urls"
+    budgets = {
+        ("POST", "validate/"): 1,  # loads the active coupons once per generation
+    }
+
+    def setUp(self):
+        super().setUp()
+        Coupon.objects.bulk_create(
+            Coupon(code=f"CODE{i}", percent_off=i % 50) for i in range(200)
+        )
 
-# Create your tests here.
+    def test_validate(self):
+        for code in ("CODE1", "CODE2", "CODE3"):
+            self.assertWithinBudget(
+                "POST", "validate/", "/api/coupons/validate/",
+                data={"code": code, "subtotal": "100.00"},
+            )
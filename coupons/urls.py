@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import CouponValidateView
+
+urlpatterns = [
+    path("validate/", CouponValidateView.as_view()),
+]
@@ -1,3 +1,29 @@
-from django.shortcuts import render
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from .redemption import CouponRejected, check_coupon
+from .serializers import CouponValidateSerializer
 
-# Create your views here.
+
+#Preview a coupon against a cart subtotal
+class CouponValidateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CouponValidateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        code = serializer.validated_data["code"]
+        subtotal = serializer.validated_data["subtotal"]
+
+        try:
+            coupon, discount = check_coupon(code, subtotal, request.user)
+        except CouponRejected as exc:
+            return Response({"valid": False, "error": str(exc)}, status=400)
+
+        return Response({
+            "valid": True,
+            "code": coupon.code,
+            "percent_off": coupon.percent_off,
+            "discount": discount,
+            "subtotal": subtotal,
+        })
@@ -0,0 +1,108 @@
+"""
+Gunicorn configuration, picked up automatically from the project root
+(or pass ``-c gunicorn.conf.py``).
+
+Everything is tunable from the environment:
+
+    GUNICORN_WORKER_CLASS   gthread (default), sync, gevent or uvicorn
+    WEB_CONCURRENCY         worker processes (default: sized from CPU count
+                            with REDIS_URL, otherwise 1)
+    GUNICORN_THREADS        threads per gthread worker (default 4, or
+                            4 x (2 x CPUs + 1) for a single worker)
+    GUNICORN_CONNECTIONS    concurrent connections per gevent/uvicorn worker
+    GUNICORN_PRELOAD        load the app before forking (default True)
+    GUNICORN_TIMEOUT        seconds before a silent worker is restarted
+    PORT                    port to bind on 0.0.0.0 (default 8000)
+
+gevent needs ``pip install gevent psycogreen``; uvicorn serves the ASGI
+app and turns on ASYNC_VIEWS unless it is set explicitly.
+"""
+import multiprocessing
+import os
+
+cpus = multiprocessing.cpu_count()
+
+worker_class_name = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "gevent": "gevent",
+    "uvicorn": "uvicorn_worker.UvicornWorker",
+}
+if worker_class_name not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}")
+worker_class = WORKER_CLASSES[worker_class_name]
+
+if worker_class_name == "uvicorn":
+    wsgi_app = "ravoos_pansy.asgi:application"
+    os.environ.setdefault("ASYNC_VIEWS", "True")
+else:
+    wsgi_app = "ravoos_pansy.wsgi:application"
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Catalog and coupon invalidation and Idempotency-Key claims go through the
+# Django cache. Without REDIS_URL that is LocMemCache, private to each
+# process, so a second worker would serve stale data and could run a
+# retried checkout twice. Threads inside one worker share it safely.
+shared_cache = bool(os.getenv("REDIS_URL"))
+
+# Blocking workers spend most of a request waiting on the database, so run
+# more of them than cores; event-loop workers need one per core. Without a
+# shared cache there is only one (see on_starting).
+if not shared_cache:
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+elif worker_class_name in ("sync", "gthread"):
+    workers = int(os.getenv("WEB_CONCURRENCY", cpus * 2 + 1))
+else:
+    workers = int(os.getenv("WEB_CONCURRENCY", cpus))
+
+# A lone worker (no shared cache) gets the threads the sized-up workers
+# would have had between them, so a few slow clients can't take them all
+default_threads = 4 if shared_cache else 4 * (cpus * 2 + 1)
+threads = int(os.getenv("GUNICORN_THREADS", default_threads)) if worker_class_name == "gthread" else 1
+worker_connections = int(os.getenv("GUNICORN_CONNECTIONS", "1000"))
+
+# Import Django and the app once in the master; workers share those pages
+# copy-on-write instead of each loading their own copy
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so a slow leak can't grow without bound;
+# the jitter keeps them from all restarting at once
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Checked here rather than in the Django settings, so manage.py commands
+    # still run where WEB_CONCURRENCY is set for the server (e.g. on Render).
+    # server.cfg also sees a -w/--workers given on the command line.
+    if server.cfg.workers > 1 and not shared_cache:
+        raise RuntimeError(
+            f"{server.cfg.workers} workers need a cache shared between them: set REDIS_URL "
+            "(or WEB_CONCURRENCY=1)"
+        )
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # A connection opened in the master while preloading must not be
+        # shared by the forked workers
+        from django.db import connections
+
+        connections.close_all()
+
+    if worker_class_name == "gevent":
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning("psycogreen is not installed: database calls will block gevent workers")
+        else:
+            patch_psycopg()
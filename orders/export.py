@@ -0,0 +1,118 @@
+"""
+Streaming order export (CSV or NDJSON) for staff.
+
+Orders are read through a server-side cursor in chunks of
+EXPORT_CHUNK_SIZE, and each chunk's items are fetched with one query, so
+memory use stays flat however many orders are exported.
+"""
+import csv
+
+from ravoos_pansy.renderers import FastJSONRenderer
+from .models import OrderItem
+
+EXPORT_CHUNK_SIZE = 2000
+
+ORDER_FIELDS = (
+    "id", "created_at", "user__email", "status",
+    "subtotal", "gst", "discount", "total", "address_text",
+)
+ITEM_FIELDS = ("product_id", "product__name", "quantity", "price")
+
+CSV_HEADER = (
+    "order_id", "created_at", "user_email", "status",
+    "subtotal", "gst", "discount", "total", "address",
+    "product_id", "product_name", "quantity", "price",
+)
+
+
+def order_chunks(queryset, chunk_size=None):
+    """Yield ``[(order_row, [item_row, ...]), ...]`` lists of ``chunk_size`` orders."""
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    rows = queryset.values_list(*ORDER_FIELDS).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield with_items(chunk)
+            chunk = []
+    if chunk:
+        yield with_items(chunk)
+
+
+def with_items(orders):
+    items = {row[0]: [] for row in orders}
+    for order_id, *item in (
+        OrderItem.objects.filter(order_id__in=list(items))
+        .order_by("order_id", "id")
+        .values_list("order_id", *ITEM_FIELDS)
+    ):
+        items[order_id].append(item)
+    return [(row, items[row[0]]) for row in orders]
+
+
+# Spreadsheets run a cell that starts with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def csv_cell(value):
+    """Quote user text (names, addresses) so a spreadsheet shows it as text."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class Echo:
+    """csv.writer target that hands back each line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset):
+    # One line per order item; an order without items gets a single line
+    # with the item columns left empty
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for chunk in order_chunks(queryset):
+        lines = []
+        for order, items in chunk:
+            order = (*order[:1], order[1].isoformat(), *order[2:])
+            for item in items or [("", "", "", "")]:
+                lines.append(writer.writerow([csv_cell(value) for value in (*order, *item)]))
+        yield "".join(lines)
+
+
+def iter_ndjson(queryset):
+    # One JSON object per order, items nested, amounts as strings like the API
+    renderer = FastJSONRenderer()
+    for chunk in order_chunks(queryset):
+        lines = []
+        for order, items in chunk:
+            order_id, created_at, email, status, subtotal, gst, discount, total, address = order
+            lines.append(renderer.render({
+                "order_id": order_id,
+                "created_at": created_at,
+                "user_email": email,
+                "status": status,
+                "subtotal": str(subtotal),
+                "gst": str(gst),
+                "discount": str(discount),
+                "total": str(total),
+                "address": address,
+                "items": [
+                    {
+                        "product_id": product_id,
+                        "product_name": name,
+                        "quantity": quantity,
+                        "price": str(price),
+                    }
+                    for product_id, name, quantity, price in items
+                ],
+            }))
+        yield b"\n".join(lines) + b"\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv", "csv"),
+    "ndjson": (iter_ndjson, "application/x-ndjson", "ndjson"),
+}
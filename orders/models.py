@@ -37,6 +37,15 @@ class Order(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Order history: a user's orders, newest first
+            models.Index(fields=["user", "created_at"], name="order_user_created_idx"),
+            # Staff export by date range
+            models.Index(fields=["created_at", "id"], name="order_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.user}"
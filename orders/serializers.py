@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from ravoos_pansy.fast_serializers import ValuesSerializer
 from .models import Order, OrderItem
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -22,3 +23,36 @@ class OrderSerializer(serializers.ModelSerializer):
             "created_at",
             "items",
         ]
+
+
+#Header-only view of an order (no items)
+class OrderSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "subtotal",
+            "gst",
+            "discount",
+            "total",
+            "status",
+            "created_at",
+        ]
+
+
+#Admin export query params
+class OrderExportQuerySerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if "date_from" in data and "date_to" in data and data["date_from"] > data["date_to"]:
+            raise serializers.ValidationError({"date_to": "Must not be before date_from"})
+        return data
+
+
+#Fast read paths for order history (same output as the serializers above)
+order_values = ValuesSerializer(OrderSerializer)
+order_summary_values = ValuesSerializer(OrderSummarySerializer)
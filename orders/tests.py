@@ -1,3 +1,462 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from cart.models import CartItem
+from products.models import Category, Product
+from ravoos_pansy.testing import QueryBudgetMixin
+from users.models import Address, User
+from .models import Order, OrderItem
+
+
+class OrderTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("buyer@example.com", "Buyer")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name="Food", slug="food", theme="food")
+        self.address = Address.objects.create(
+            user=self.user, full_name="Buyer", phone="1234567890", street="1 Main St",
+            city="City", state="State", pincode="123456",
+        )
+
+    def create_products(self, count, price="100.00"):
+        return Product.objects.bulk_create(
+            Product(name=f"Product {i}", price=price, category=self.category)
+            for i in range(count)
+        )
+
+    def create_order(self, products=(), status="placed"):
+        order = Order.objects.create(
+            user=self.user, subtotal="100.00", gst="5.00", total="105.00",
+            address_text="1 Main St", status=status,
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=1, price=product.price)
+            for product in products
+        )
+        return order
+
+    def fill_cart(self, products, quantity=2):
+        CartItem.objects.bulk_create(
+            CartItem(user=self.user, product=product, quantity=quantity)
+            for product in products
+        )
+
+    def checkout(self, headers=None, **data):
+        return self.client.post(
+            "/api/orders/checkout/", {"address_id": self.address.pk, **data},
+            headers=headers,
+        )
+
+
+class CheckoutTests(OrderTestCase):
+    def test_creates_order_and_clears_cart(self):
+        self.fill_cart(self.create_products(3, price="100.00"))
+
+        response = self.checkout()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(str(response.data["subtotal"]), "600.00")
+
+        order = Order.objects.get(pk=response.data["order_id"])
+        self.assertEqual(order.items.count(), 3)
+        self.assertFalse(CartItem.objects.filter(user=self.user).exists())
+
+    def test_query_count_is_independent_of_cart_size(self):
+        counts = []
+        for size in (1, 30):
+            self.fill_cart(self.create_products(size))
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.checkout()
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_failure_rolls_back_everything(self):
+        self.fill_cart(self.create_products(3))
+
+        with mock.patch.object(OrderItem.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.checkout()
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 3)
+
+    def test_empty_cart(self):
+        response = self.checkout()
+        self.assertEqual(response.status_code, 400)
+
+
+class CheckoutStockTests(OrderTestCase):
+    def test_decrements_tracked_stock(self):
+        tracked, exact, untracked = self.create_products(3)
+        Product.objects.filter(pk=tracked.pk).update(stock=10)
+        Product.objects.filter(pk=exact.pk).update(stock=2)
+        self.fill_cart([tracked, exact, untracked], quantity=2)
+
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, 200)
+        stock = dict(Product.objects.values_list("pk", "stock"))
+        self.assertEqual(stock, {tracked.pk: 8, exact.pk: 0, untracked.pk: None})
+
+    def test_insufficient_stock_lists_every_short_item(self):
+        short, empty, fine = self.create_products(3)
+        Product.objects.filter(pk=short.pk).update(stock=1)
+        Product.objects.filter(pk=empty.pk).update(stock=0)
+        Product.objects.filter(pk=fine.pk).update(stock=5)
+        self.fill_cart([short, empty, fine], quantity=2)
+
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["items"], [
+            {"product_id": short.pk, "name": short.name, "requested": 2, "available": 1},
+            {"product_id": empty.pk, "name": empty.name, "requested": 2, "available": 0},
+        ])
+        self.assertEqual(Product.objects.get(pk=fine.pk).stock, 5)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 3)
+
+    def test_stock_is_not_in_catalog_responses(self):
+        product, = self.create_products(1)
+        response = self.client.get(f"/api/products/{product.pk}/")
+        self.assertNotIn("stock", response.json())
+
+
+# SQLite test databases live in shared-cache memory, where concurrent
+# writers fail with "table is locked" instead of waiting
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentCheckoutTests(TransactionTestCase):
+    buyers = 12
+    stock = 5
+
+    def test_hot_product_is_never_oversold(self):
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        product = Product.objects.create(name="Burger", price="120.00", category=category, stock=self.stock)
+
+        clients = []
+        for i in range(self.buyers):
+            user = User.objects.create_user(f"buyer{i}@example.com", "Buyer")
+            address = Address.objects.create(
+                user=user, full_name="Buyer", phone="1234567890", street="1 Main St",
+                city="City", state="State", pincode="123456",
+            )
+            CartItem.objects.create(user=user, product=product, quantity=1)
+            client = APIClient()
+            client.force_authenticate(user=user)
+            clients.append((client, address.pk))
+
+        def checkout(args):
+            client, address_id = args
+            try:
+                return client.post("/api/orders/checkout/", {"address_id": address_id}).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.buyers) as pool:
+            statuses = list(pool.map(checkout, clients))
+
+        self.assertEqual(statuses.count(200), self.stock)
+        self.assertEqual(statuses.count(409), self.buyers - self.stock)
+        self.assertEqual(Product.objects.get(pk=product.pk).stock, 0)
+        self.assertEqual(OrderItem.objects.count(), self.stock)
+
+
+class CheckoutIdempotencyTests(OrderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.fill_cart(self.create_products(2))
+
+    def test_retry_returns_the_stored_order(self):
+        first = self.checkout(headers={"Idempotency-Key": "abc"})
+        with self.assertNumQueries(0):
+            retry = self.checkout(headers={"Idempotency-Key": "abc"})
+
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_for_another_payload(self):
+        self.checkout(headers={"Idempotency-Key": "abc"})
+        response = self.checkout(headers={"Idempotency-Key": "abc"}, coupon="OTHER")
+        self.assertEqual(response.status_code, 422)
+
+    def test_keys_are_scoped_per_user(self):
+        self.checkout(headers={"Idempotency-Key": "abc"})
+
+        other = User.objects.create_user("other@example.com", "Other")
+        self.client.force_authenticate(user=other)
+        response = self.checkout(headers={"Idempotency-Key": "abc"})
+        self.assertEqual(response.data, {"error": "Cart is empty"})
+
+    def test_failed_attempt_can_be_retried(self):
+        with mock.patch.object(OrderItem.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.checkout(headers={"Idempotency-Key": "abc"})
+
+        response = self.checkout(headers={"Idempotency-Key": "abc"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class OrderConditionalGetTests(OrderTestCase):
+    def test_not_modified(self):
+        self.create_order()
+        etag = self.client.get("/api/orders/")["ETag"]
+
+        with self.assertNumQueries(1):  # validators only
+            response = self.client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_status_change_changes_etag(self):
+        order = self.create_order()
+        etag = self.client.get("/api/orders/")["ETag"]
+
+        self.client.patch(f"/api/orders/{order.pk}/status/", {"status": "shipped"})
+        response = self.client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["status"], "shipped")
+
+    def test_item_changes_change_etag(self):
+        rice, dal = self.create_products(2)
+        self.create_order([rice, dal])
+        etag = self.client.get("/api/orders/")["ETag"]
+
+        # Neither touches the order's updated_at
+        rice.delete()
+        response = self.client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["product"] for item in response.data[0]["items"]], [None, dal.pk])
+
+        OrderItem.objects.filter(product=dal).delete()
+        response = self.client.get("/api/orders/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data[0]["items"]), 1)
+
+    def test_deleting_an_order_changes_etag(self):
+        old = self.create_order(status="delivered")
+        self.create_order()
+        etag = self.client.get("/api/orders/", {"view": "summary"})["ETag"]
+
+        self.client.delete(f"/api/orders/{old.pk}/delete/")
+        response = self.client.get("/api/orders/", {"view": "summary"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(len(response.data), 1)
+
+    def test_etag_is_per_user(self):
+        self.create_order()
+        etag = self.client.get("/api/orders/")["ETag"]
+
+        other = User.objects.create_user("other@example.com", "Other")
+        self.client.force_authenticate(user=other)
+        response = self.client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [])
+
+
+class OrderHistoryTests(OrderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.products = self.create_products(3)
+
+    def test_query_count_is_independent_of_order_count(self):
+        counts = []
+        for batch in (2, 20):
+            for _ in range(batch):
+                self.create_order(self.products)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get("/api/orders/")
+            self.assertEqual(len(response.data[0]["items"]), 3)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_keyset_pages_newest_first(self):
+        orders = [self.create_order(self.products) for _ in range(5)]
+
+        ids = []
+        url = "/api/orders/?page_size=2"
+        while url:
+            response = self.client.get(url)
+            ids.extend(order["id"] for order in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(ids, [order.pk for order in reversed(orders)])
+
+    def test_summary_view_skips_items(self):
+        for _ in range(3):
+            self.create_order(self.products)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/orders/", {"view": "summary", "page_size": 2})
+        self.assertNotIn("items", response.data["results"][0])
+        self.assertFalse(any("orders_orderitem" in q["sql"] for q in ctx.captured_queries))
+
+
+class OrderExportTests(OrderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = True
+        self.user.save()
+        self.products = self.create_products(2)
+        self.orders = [
+            self.create_order(self.products, status=status)
+            for status in ("placed", "delivered", "delivered")
+        ]
+        self.create_order(status="cancelled")  # no items
+        Order.objects.filter(pk=self.orders[0].pk).update(
+            created_at=datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+        )
+
+    def export(self, **params):
+        response = self.client.get("/api/orders/admin/export/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_has_one_line_per_item(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0]["order_id"], str(self.orders[0].pk))
+        self.assertEqual(rows[0]["user_email"], "buyer@example.com")
+        self.assertEqual(rows[0]["product_name"], "Product 0")
+        self.assertEqual(rows[0]["price"], "100.00")
+        self.assertEqual(rows[-1]["status"], "cancelled")
+        self.assertEqual(rows[-1]["product_id"], "")
+
+    def test_csv_escapes_formulas(self):
+        Order.objects.filter(pk=self.orders[0].pk).update(address_text='=HYPERLINK("http://x","y")')
+        Product.objects.filter(name="Product 0").update(name="@SUM(A1:A9)")
+
+        _, body = self.export()
+        row = next(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(row["address"], '\'=HYPERLINK("http://x","y")')
+        self.assertEqual(row["product_name"], "'@SUM(A1:A9)")
+        self.assertEqual(row["total"], "105.00")
+
+        _, body = self.export(type="ndjson")
+        self.assertEqual(json.loads(body.splitlines()[0])["address"], '=HYPERLINK("http://x","y")')
+
+    def test_ndjson_has_one_line_per_order(self):
+        response, body = self.export(type="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        orders = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(orders), 4)
+        self.assertEqual(orders[0]["order_id"], self.orders[0].pk)
+        self.assertEqual(orders[0]["created_at"], "2026-01-10T12:00:00Z")
+        self.assertEqual(orders[0]["total"], "105.00")
+        self.assertEqual(len(orders[0]["items"]), 2)
+        self.assertEqual(orders[-1]["items"], [])
+
+    def test_filters(self):
+        _, body = self.export(type="ndjson", status="delivered")
+        self.assertEqual(len(body.splitlines()), 2)
+
+        _, body = self.export(type="ndjson", date_from="2026-01-10", date_to="2026-01-10")
+        self.assertEqual([json.loads(line)["order_id"] for line in body.splitlines()], [self.orders[0].pk])
+
+        _, body = self.export(type="ndjson", date_to="2026-01-09")
+        self.assertEqual(body, "")
+
+    def test_reads_in_chunks(self):
+        with mock.patch("orders.export.EXPORT_CHUNK_SIZE", 2):
+            response = self.client.get("/api/orders/admin/export/")
+            # Orders cursor plus one items query per chunk of 2 orders
+            with self.assertNumQueries(3):
+                list(response.streaming_content)
+
+    def test_invalid_params(self):
+        for params in ({"type": "xml"}, {"status": "lost"}, {"date_from": "2026-02-01", "date_to": "2026-01-01"}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/orders/admin/export/", params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get("/api/orders/admin/export/")
+        self.assertEqual(response.status_code, 403)
+
+
+class OrderQueryBudgetTests(QueryBudgetMixin, OrderTestCase):
+    urlconf = "orders.urls"
+    budgets = {
+        ("POST", "checkout/"): 8,  # includes the savepoint pair
+        ("GET", ""): 3,
+        ("GET", "<int:pk>/"): 2,
+        # Deletes also read the orders and items to subtract from the sales
+        # rollups, in a transaction (savepoint pair)
+        ("DELETE", "<int:pk>/delete/"): 8,  # includes detaching coupon redemptions
+        ("DELETE", "delete-all/"): 9,
+        ("PATCH", "<int:pk>/status/"): 4,  # locked read + update, plus the savepoint pair
+        ("GET", "admin/export/"): 0,  # rows are read while the body streams
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.products = self.create_products(50)
+        orders = Order.objects.bulk_create(
+            Order(
+                user=self.user, subtotal="100.00", gst="5.00", total="105.00",
+                address_text="1 Main St", status="delivered",
+            )
+            for _ in range(200)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=1, price=product.price)
+            for order in orders
+            for product in self.products[:5]
+        )
+        self.order = orders[0]
+
+    def test_checkout(self):
+        # Tracked stock costs the extra UPDATE
+        Product.objects.update(stock=100)
+        self.fill_cart(self.products[:30])
+        self.assertWithinBudget(
+            "POST", "checkout/", "/api/orders/checkout/",
+            data={"address_id": self.address.pk},
+        )
+
+    def test_list(self):
+        for params in ({}, {"page_size": 20}, {"view": "summary"}):
+            self.assertWithinBudget("GET", "", "/api/orders/", data=params)
+
+    def test_detail(self):
+        self.assertWithinBudget("GET", "<int:pk>/", f"/api/orders/{self.order.pk}/")
+
+    def test_delete(self):
+        self.assertWithinBudget(
+            "DELETE", "<int:pk>/delete/", f"/api/orders/{self.order.pk}/delete/"
+        )
+
+    def test_delete_all(self):
+        self.assertWithinBudget("DELETE", "delete-all/", "/api/orders/delete-all/")
+
+    def test_status_update(self):
+        self.assertWithinBudget(
+            "PATCH", "<int:pk>/status/", f"/api/orders/{self.order.pk}/status/",
+            data={"status": "shipped"},
+        )
+
+    def test_export(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertWithinBudget("GET", "admin/export/", "/api/orders/admin/export/")
 
-# Create your tests here.
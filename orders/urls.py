@@ -5,7 +5,8 @@ from .views import (
     OrderDetailView,
     OrderDeleteView,
     OrderDeleteAllView,
-    OrderStatusUpdateView
+    OrderStatusUpdateView,
+    OrderExportView,
 )
 
 urlpatterns = [
@@ -15,4 +16,5 @@ urlpatterns = [
     path("<int:pk>/delete/", OrderDeleteView.as_view()),
     path("delete-all/", OrderDeleteAllView.as_view()),
     path("<int:pk>/status/", OrderStatusUpdateView.as_view()),
+    path("admin/export/", OrderExportView.as_view()),
 ]
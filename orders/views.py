@@ -1,97 +1,163 @@
-from decimal import Decimal
+from datetime import datetime, time, timedelta
+from itertools import chain, islice
+
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from cart.models import CartItem
 from users.models import Address
-from coupons.models import Coupon
+from cart.pricing import lines_subtotal, price_cart
+from coupons.redemption import CouponRejected, redeem_coupon
+from products.inventory import InsufficientStock, reserve_stock
+from analytics.rollups import record_checkout, record_status_change, remove_orders
 from .models import Order, OrderItem
-from .serializers import OrderSerializer
+from .serializers import (
+    OrderExportQuerySerializer,
+    OrderSerializer,
+    order_summary_values,
+    order_values,
+)
+from .export import EXPORT_FORMATS
+from products.permissions import IsAdmin
+from ravoos_pansy.pagination import KeysetPagination
+from ravoos_pansy.idempotency import idempotent
+from ravoos_pansy.renderers import STREAM_CHUNK_SIZE, StreamingJSONResponse
+from ravoos_pansy.conditional import (
+    not_modified_response,
+    queryset_etag,
+    set_etag_header,
+)
 
 #CHECKOUT VIEW
 class CheckoutView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         user = request.user
         address_id = request.data.get("address_id")
         coupon_code = request.data.get("coupon")
 
-        cart_items = CartItem.objects.filter(user=user)
-
-        if not cart_items.exists():
-            return Response({"error": "Cart is empty"}, status=400)
-
-        # Address
+        # The whole checkout commits or rolls back as one unit, so a failure
+        # can never leave a half-built order behind with the cart intact
         try:
-            address = Address.objects.get(id=address_id, user=user)
-        except Address.DoesNotExist:
-            return Response({"error": "Invalid address"}, status=400)
-
-        # Subtotal
-        subtotal = Decimal("0")
-        for item in cart_items:
-            subtotal += item.product.price * item.quantity
-
-        # GST (5%)
-        gst = subtotal * Decimal("0.05")
-
-        # Coupon
-        discount = Decimal("0")
-        if coupon_code:
-            try:
-                coupon = Coupon.objects.get(code=coupon_code, is_active=True)
-                discount = coupon.discount_amount
-            except Coupon.DoesNotExist:
-                return Response({"error": "Invalid coupon"}, status=400)
-
-        total = subtotal + gst - discount
-        if total < 0:
-            total = Decimal("0")
-
-        # Create Order
-        address_text = (
-            f"{address.full_name}, {address.street}, "
-            f"{address.city}, {address.state} - {address.pincode}"
-        )
-
-        order = Order.objects.create(
-            user=user,
-            subtotal=subtotal,
-            gst=gst,
-            discount=discount,
-            total=total,
-            address_text=address_text,
-        )
-
-        # Create Order Items
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                price=item.product.price,
+            with transaction.atomic():
+                # One joined fetch that also locks the cart lines and their
+                # products. Products are locked in id order, so concurrent
+                # checkouts of the same products queue instead of deadlocking.
+                cart_items = list(
+                    CartItem.objects.filter(user=user)
+                    .select_related("product")
+                    .select_for_update(of=("self", "product"))
+                    .order_by("product_id")
+                )
+
+                if not cart_items:
+                    return Response({"error": "Cart is empty"}, status=400)
+
+                # Address
+                try:
+                    address = Address.objects.get(id=address_id, user=user)
+                except Address.DoesNotExist:
+                    return Response({"error": "Invalid address"}, status=400)
+
+                # Subtotal, GST (5%) and coupon, priced like the cart summary.
+                # redeem_coupon() below enforces the coupon's limits under lock.
+                coupon, totals = price_cart(lines_subtotal(cart_items), coupon_code)
+
+                # Stock: one conditional UPDATE for every tracked line
+                reserve_stock([(item.product, item.quantity) for item in cart_items])
+
+                # Create Order
+                address_text = (
+                    f"{address.full_name}, {address.street}, "
+                    f"{address.city}, {address.state} - {address.pincode}"
+                )
+
+                order = Order.objects.create(
+                    user=user,
+                    **totals,
+                    address_text=address_text,
+                )
+
+                # Create Order Items
+                OrderItem.objects.bulk_create(
+                    OrderItem(
+                        order=order,
+                        product=item.product,
+                        quantity=item.quantity,
+                        price=item.product.price,
+                    )
+                    for item in cart_items
+                )
+
+                # Count the coupon use against its limits
+                if coupon is not None:
+                    redeem_coupon(coupon, user, order)
+
+                # Sales rollups, written once the order commits
+                record_checkout(order, cart_items)
+
+                # Clear the items that were ordered (not ones added meanwhile)
+                CartItem.objects.filter(id__in=[item.id for item in cart_items]).delete()
+        except InsufficientStock as exc:
+            return Response(
+                {"error": "Insufficient stock", "items": exc.items},
+                status=409
             )
+        except CouponRejected as exc:
+            return Response({"error": str(exc)}, status=400)
 
-        # Clear cart
-        cart_items.delete()
-
-        return Response({
-            "order_id": order.id,
-            "subtotal": subtotal,
-            "gst": gst,
-            "discount": discount,
-            "total": total,
-        })
+        return Response({"order_id": order.id, **totals})
     
 #ORDER HISTORY APIs
+class OrderPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
 class OrderListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        orders = Order.objects.filter(user=request.user).order_by("-created_at")
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        orders = Order.objects.filter(user=request.user).order_by("-created_at", "-id")
+
+        # ?view=summary returns order headers only and never touches OrderItem.
+        # Both build dicts from .values() rows; items are one extra query.
+        if request.query_params.get("view") == "summary":
+            fast, related_counts = order_summary_values, ()
+        else:
+            # Items have no timestamp of their own and deleting a product
+            # nulls theirs without touching the order, so count both
+            fast, related_counts = order_values, ("items", "items__product")
+
+        etag = queryset_etag(request, orders, related_counts=related_counts)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        orders = fast.values(orders)
+
+        paginator = OrderPagination()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        if page is not None:
+            response = paginator.get_paginated_response(fast.serialize(page, request))
+        else:
+            # The full history of a heavy buyer is streamed in chunks rather
+            # than built in memory; short ones are rendered as usual
+            rows = orders.iterator(chunk_size=STREAM_CHUNK_SIZE)
+            head = list(islice(rows, STREAM_CHUNK_SIZE + 1))
+            if len(head) <= STREAM_CHUNK_SIZE:
+                response = Response(fast.serialize(head, request))
+            else:
+                response = StreamingJSONResponse(
+                    fast.serialize_chunks(chain(head, rows), request, STREAM_CHUNK_SIZE)
+                )
+
+        set_etag_header(response, etag)
+        return response
 
 #Order Detail (Bill)
 class OrderDetailView(APIView):
@@ -122,7 +188,9 @@ class OrderDeleteView(APIView):
                 status=400
             )
 
-        order.delete()
+        with transaction.atomic():
+            remove_orders(Order.objects.filter(pk=order.pk))
+            order.delete()
         return Response({"message": "Order deleted successfully"})
 
 
@@ -131,7 +199,10 @@ class OrderDeleteAllView(APIView):
     permission_classes = [IsAuthenticated]
 
     def delete(self, request):
-        Order.objects.filter(user=request.user).delete()
+        orders = Order.objects.filter(user=request.user)
+        with transaction.atomic():
+            remove_orders(orders)
+            orders.delete()
         return Response({"message": "All orders deleted"})
     
 
@@ -139,11 +210,6 @@ class OrderStatusUpdateView(APIView):
     permission_classes = [IsAuthenticated]  # dev only
 
     def patch(self, request, pk):
-        try:
-            order = Order.objects.get(id=pk)
-        except Order.DoesNotExist:
-            return Response({"error": "Order not found"}, status=404)
-
         new_status = request.data.get("status")
 
         allowed_statuses = [
@@ -158,8 +224,18 @@ class OrderStatusUpdateView(APIView):
         if new_status not in allowed_statuses:
             return Response({"error": "Invalid status"}, status=400)
 
-        order.status = new_status
-        order.save(update_fields=["status"])
+        # Locked so concurrent updates see each other's old status and the
+        # sales rollups are adjusted once per cancel/un-cancel
+        with transaction.atomic():
+            try:
+                order = Order.objects.select_for_update().get(id=pk)
+            except Order.DoesNotExist:
+                return Response({"error": "Order not found"}, status=404)
+
+            old_status = order.status
+            order.status = new_status
+            order.save(update_fields=["status", "updated_at"])
+            record_status_change(order, old_status)
 
         return Response({
             "message": "Order status updated",
@@ -168,3 +244,31 @@ class OrderStatusUpdateView(APIView):
         })
 
 
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+#Admin: export orders with their items (streamed)
+class OrderExportView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        params = OrderExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        orders = Order.objects.order_by("created_at", "id")
+        if "status" in filters:
+            orders = orders.filter(status=filters["status"])
+        if "date_from" in filters:
+            orders = orders.filter(created_at__gte=start_of_day(filters["date_from"]))
+        if "date_to" in filters:
+            # Inclusive: everything before the start of the next day
+            orders = orders.filter(created_at__lt=start_of_day(filters["date_to"] + timedelta(days=1)))
+
+        generate, content_type, extension = EXPORT_FORMATS[filters["type"]]
+        response = StreamingHttpResponse(generate(orders), content_type=content_type)
+        stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+        response["Content-Disposition"] = f'attachment; filename="orders-{stamp}.{extension}"'
+        return response
+
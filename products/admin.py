@@ -8,6 +8,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ("name", "price", "category", "is_active")
+    list_display = ("name", "sku", "price", "category", "is_active")
     list_filter = ("category", "is_active")
+    search_fields = ("name", "sku")
 
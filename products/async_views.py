@@ -0,0 +1,113 @@
+"""
+Async versions of the catalog read views, used when ASYNC_VIEWS is on.
+
+Same responses, cache entries and conditional-GET ETags as the views
+in views.py (the class names match so both share cache keys), but the
+database and cache are awaited instead of blocking a worker.
+"""
+from django.conf import settings
+from django.http import Http404
+from rest_framework.response import Response
+
+from ravoos_pansy.async_views import AsyncAPIView
+from ravoos_pansy.conditional import aqueryset_etag, not_modified_response, set_etag_header
+from ravoos_pansy.metrics import serializer_timer
+from ravoos_pansy.pagination import KeysetPagination
+from .cache import aget_generation, catalog_cache, catalog_cache_key
+from .models import Category, Product
+from .serializers import CategorySerializer, ProductReadSerializer, product_values
+from .views import active_products, filter_products
+
+
+class AsyncCatalogListView(AsyncAPIView):
+    """Cached, conditional list view; the async twin of the catalog mixins."""
+
+    queryset = None
+    serializer_class = None
+    pagination_class = None
+    conditional_timestamp_fields = ("updated_at",)
+
+    def get_queryset(self):
+        # Like GenericAPIView: a fresh clone, so no results are cached across requests
+        return self.queryset.all()
+
+    def get_paginator(self):
+        return self.pagination_class() if self.pagination_class else None
+
+    async def get(self, request, *args, **kwargs):
+        cache = catalog_cache()
+        generation = await aget_generation()
+        name = type(self).__name__
+
+        etag_key = catalog_cache_key(request, f"{name}:etag", generation)
+        etag = await cache.aget(etag_key)
+        if etag is None:
+            etag = await aqueryset_etag(request, self.get_queryset(), self.conditional_timestamp_fields)
+            await cache.aset(etag_key, etag, settings.CATALOG_CACHE_TIMEOUT)
+
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+
+        key = catalog_cache_key(request, name, generation)
+        data = await cache.aget(key)
+        if data is None:
+            data = await self.list_data(request)
+            await cache.aset(key, data, settings.CATALOG_CACHE_TIMEOUT)
+
+        response = Response(data)
+        set_etag_header(response, etag)
+        return response
+
+    async def list_data(self, request):
+        queryset = self.get_queryset()
+        context = {"request": request, "view": self}
+
+        paginator = self.get_paginator()
+        rows = await paginator.apaginate_queryset(queryset, request, self) if paginator else None
+        paginated = rows is not None
+        if not paginated:
+            rows = [row async for row in queryset]
+        with serializer_timer(request):
+            data = self.serializer_class(rows, many=True, context=context).data
+        return paginator.get_paginated_response(data).data if paginated else data
+
+
+class CategoryListView(AsyncCatalogListView):
+    queryset = Category.objects.filter(is_active=True)
+    serializer_class = CategorySerializer
+
+
+class ProductListView(AsyncCatalogListView):
+    serializer_class = ProductReadSerializer
+    pagination_class = KeysetPagination
+    conditional_timestamp_fields = ("updated_at", "category__updated_at")
+
+    def get_queryset(self):
+        return filter_products(active_products(), self.request.query_params)
+
+    async def list_data(self, request):
+        queryset = product_values.values(self.get_queryset(), "created_at")
+
+        paginator = self.get_paginator()
+        rows = await paginator.apaginate_queryset(queryset, request, self) if paginator else None
+        if rows is None:
+            return product_values.serialize([row async for row in queryset], request)
+        return paginator.get_paginated_response(product_values.serialize(rows, request)).data
+
+    def get_paginator(self):
+        # Ranked search results are already capped, keyset paging is for browsing
+        if self.request.query_params.get("search"):
+            return None
+        return super().get_paginator()
+
+
+class ProductDetailView(AsyncAPIView):
+    async def get(self, request, pk):
+        try:
+            product = await active_products().aget(pk=pk)
+        except Product.DoesNotExist:
+            raise Http404("No Product matches the given query.")
+
+        serializer = ProductReadSerializer(product, context={"request": request, "view": self})
+        return Response(serializer.data)
@@ -0,0 +1,92 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from ravoos_pansy.metrics import serializer_timer
+
+GENERATION_KEY = "catalog:generation"
+
+
+def catalog_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def get_generation():
+    cache = catalog_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so an evicted counter never falls back to a
+        # generation that still has entries cached under it
+        cache.add(GENERATION_KEY, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def aget_generation():
+    cache = catalog_cache()
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, time.time_ns() // 1000, timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """
+    Invalidate every cached catalog response.
+
+    Called from the Product/Category signals. Code that changes the catalog
+    without sending signals (queryset.update(), bulk_create) must call this.
+    """
+    cache = catalog_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        get_generation()
+
+
+def catalog_cache_key(request, prefix, generation=None):
+    if generation is None:
+        generation = get_generation()
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f"catalog:{generation}:{prefix}:{url}"
+
+
+class CatalogCacheMixin:
+    """
+    Serve list responses from the catalog cache.
+
+    Entries are keyed by the catalog generation and the full request URL, so
+    any catalog write makes all of them unreachable at once. With a shared
+    cache there is no TTL staleness and the timeout only reclaims space
+    from old generations; without one, writes made by other processes are
+    only picked up when entries expire (see CATALOG_CACHE_TIMEOUT).
+    """
+
+    def list(self, request, *args, **kwargs):
+        cache = catalog_cache()
+        key = catalog_cache_key(request, type(self).__name__)
+
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        # The list is serialized in here (its SQL is counted separately)
+        with serializer_timer(request):
+            response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
+
+    def get_etag(self, request):
+        # Conditional GET ETags are cached under the same generation
+        cache = catalog_cache()
+        key = catalog_cache_key(request, f"{type(self).__name__}:etag")
+
+        etag = cache.get(key)
+        if etag is None:
+            etag = super().get_etag(request)
+            cache.set(key, etag, settings.CATALOG_CACHE_TIMEOUT)
+        return etag
@@ -0,0 +1,149 @@
+"""
+Bulk product import (the supplier catalog feed).
+
+Rows come from a CSV or NDJSON stream and are keyed by ``sku``: a new SKU
+creates a product, a known one overwrites it. Rows are validated one by
+one and written IMPORT_BATCH_SIZE at a time with a single upsert, each
+batch in its own transaction. Invalid rows are reported with their line
+number and skipped; they never abort the rest of the import.
+
+Only the columns a row provides are written: leaving ``stock`` out of a
+feed keeps each product's stock as it is rather than clearing it.
+"""
+import csv
+import json
+
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from .cache import bump_generation
+from .models import Category, Product
+from .serializers import ProductImportRowSerializer
+
+IMPORT_BATCH_SIZE = 1000
+
+# Only the first ones are returned, the rest are just counted
+MAX_REPORTED_ERRORS = 100
+
+# Columns an import may overwrite, in a fixed order so rows that provide
+# the same ones share an upsert
+UPDATE_FIELDS = ("name", "description", "price", "category", "image", "stock", "is_active")
+
+
+def csv_rows(lines):
+    """``(line, row)`` for each record of a CSV stream with a header row."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        # An empty cell means "not given": the column is left as it is
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def ndjson_rows(lines):
+    """``(line, row)`` for each object of an NDJSON stream; None if a line isn't JSON."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+IMPORT_FORMATS = {"csv": csv_rows, "ndjson": ndjson_rows}
+
+
+def row_error(report, line, row, errors):
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({
+            "line": line,
+            "sku": row.get("sku") if isinstance(row, dict) else None,
+            "errors": {field: [str(message) for message in messages] for field, messages in errors.items()},
+        })
+
+
+def valid_products(rows, report):
+    """
+    Yield ``(line, row, product, fields)`` for every valid row, where
+    ``fields`` are the UPDATE_FIELDS it provides. Invalid rows are recorded
+    in ``report``.
+    """
+    # Categories are few, so resolve every slug from one lookup up front
+    categories = dict(Category.objects.values_list("slug", "id"))
+    serializer = ProductImportRowSerializer()
+
+    for line, row in rows:
+        if row is None:
+            row_error(report, line, row, {"non_field_errors": ["Invalid JSON"]})
+            continue
+        try:
+            data = serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            row_error(report, line, row, serializers.as_serializer_error(exc))
+            continue
+
+        fields = tuple(name for name in UPDATE_FIELDS if name in data)
+        category_id = categories.get(data.pop("category"))
+        if category_id is None:
+            row_error(report, line, row, {"category": ["Unknown category"]})
+            continue
+        yield line, row, Product(category_id=category_id, **data), fields
+
+
+def upsert(entries, report):
+    """Write ``{sku: (line, row, product, fields)}`` in one transaction."""
+    groups = {}
+    for line, row, product, fields in entries.values():
+        groups.setdefault(fields, []).append(product)
+
+    with transaction.atomic():
+        existing = set(Product.objects.filter(sku__in=list(entries)).values_list("sku", flat=True))
+        for fields, products in groups.items():
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=["sku"],
+                update_fields=[*fields, "updated_at"],
+            )
+    report["created"] += len(entries) - len(existing)
+    report["updated"] += len(existing)
+
+
+def write_batch(batch, report):
+    try:
+        upsert(batch, report)
+    except DatabaseError:
+        # Something the validation let through (e.g. a value out of the
+        # column's range): retry row by row to find and report the culprits
+        for sku, entry in batch.items():
+            try:
+                upsert({sku: entry}, report)
+            except DatabaseError as exc:
+                line, row, *_ = entry
+                row_error(report, line, row, {"non_field_errors": [str(exc)]})
+
+
+def import_products(rows, batch_size=None):
+    """
+    Upsert products from ``(line, row)`` pairs (see csv_rows/ndjson_rows).
+
+    Returns ``{"created", "updated", "failed", "errors"}``. When a SKU
+    appears more than once, the last row wins.
+    """
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    report = {"created": 0, "updated": 0, "failed": 0, "errors": []}
+
+    batch = {}
+    for line, row, product, fields in valid_products(rows, report):
+        # One upsert can't touch the same row twice, so dedupe per batch
+        batch[product.sku] = (line, row, product, fields)
+        if len(batch) == batch_size:
+            write_batch(batch, report)
+            batch = {}
+    if batch:
+        write_batch(batch, report)
+
+    # bulk_create skips the model signals, so invalidate cached listings here
+    if report["created"] or report["updated"]:
+        transaction.on_commit(bump_generation)
+    return report
@@ -0,0 +1,64 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+
+from .models import Product
+
+
+class InsufficientStock(Exception):
+    def __init__(self, items):
+        super().__init__("Insufficient stock")
+        self.items = items
+
+
+def shortages(lines):
+    """Per-item errors for ``(product, quantity)`` lines that can't be filled."""
+    return [
+        {
+            "product_id": product.pk,
+            "name": product.name,
+            "requested": quantity,
+            "available": product.stock,
+        }
+        for product, quantity in lines
+        if product.stock is not None and product.stock < quantity
+    ]
+
+
+def reserve_stock(lines):
+    """
+    Take stock for ``(product, quantity)`` lines in a single UPDATE.
+
+    The caller must hold row locks on the products (select_for_update,
+    taken in id order), so the stock values on ``lines`` are current and
+    every short line is reported at once. The ``stock >= quantity`` guard on
+    the UPDATE keeps stock from going negative even if a caller forgets.
+    Products with untracked stock (None) are skipped. Raises
+    InsufficientStock, which must roll back the surrounding transaction.
+    """
+    errors = shortages(lines)
+    if errors:
+        raise InsufficientStock(errors)
+
+    tracked = [(product, quantity) for product, quantity in lines if product.stock is not None]
+    if not tracked:
+        return
+
+    updated = Product.objects.filter(
+        reduce(or_, (Q(pk=product.pk, stock__gte=quantity) for product, quantity in tracked))
+    ).update(
+        stock=Case(
+            *(When(pk=product.pk, then=F("stock") - quantity) for product, quantity in tracked),
+            default=F("stock"),
+            output_field=PositiveIntegerField(),
+        )
+    )
+
+    if updated != len(tracked):
+        current = dict(
+            Product.objects.filter(pk__in=[product.pk for product, _ in tracked]).values_list("pk", "stock")
+        )
+        for product, _ in tracked:
+            product.stock = current.get(product.pk, 0)
+        raise InsufficientStock(shortages(tracked))
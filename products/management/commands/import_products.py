@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from products.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_products
+
+
+class Command(BaseCommand):
+    help = "Create or update products from a CSV or NDJSON feed, keyed by sku"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file, or - to read stdin")
+        parser.add_argument(
+            "--type", dest="feed_type", choices=sorted(IMPORT_FORMATS),
+            help="Feed format (default: from the file extension, csv for stdin)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per upsert",
+        )
+
+    def handle(self, *args, path, feed_type, batch_size, **kwargs):
+        if feed_type is None:
+            feed_type = "ndjson" if Path(path).suffix in (".ndjson", ".jsonl") else "csv"
+        rows = IMPORT_FORMATS[feed_type]
+
+        self.stdout.write(f"📦 Importing products from {path}...")
+        if path == "-":
+            report = import_products(rows(sys.stdin), batch_size)
+        else:
+            with open(path, encoding="utf-8-sig", newline="") as feed:
+                report = import_products(rows(feed), batch_size)
+
+        for error in report["errors"]:
+            messages = "; ".join(
+                f"{field}: {' '.join(messages)}" for field, messages in error["errors"].items()
+            )
+            self.stderr.write(f"line {error['line']} ({error['sku'] or 'no sku'}): {messages}")
+        hidden = report["failed"] - len(report["errors"])
+        if hidden:
+            self.stderr.write(f"... and {hidden} more invalid rows")
+
+        summary = f"{report['created']} created, {report['updated']} updated, {report['failed']} failed"
+        if report["failed"]:
+            self.stdout.write(self.style.WARNING(f"⚠ Import finished with errors ({summary})"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ Import completed successfully ({summary})"))
@@ -4,6 +4,7 @@ from faker import Faker
 import random
 
 from products.models import Product, Category
+from products import seeding
 
 fake = Faker()
 
@@ -11,14 +12,48 @@ fake = Faker()
 class Command(BaseCommand):
     help = "Seed database with realistic product data"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", type=float,
+            help="Generate a load-testing dataset: 10k products, 2k users and 5k orders per unit",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for --scale runs")
+        parser.add_argument("--workers", type=int, help="Generator processes (default: CPU count)")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per INSERT batch")
+        parser.add_argument("--no-copy", action="store_true", help="Use INSERT even on PostgreSQL")
+        parser.add_argument(
+            "--flush", action="store_true",
+            help="Delete catalog, carts, orders and generated users before a --scale run",
+        )
+
     def handle(self, *args, **kwargs):
         self.stdout.write("🌱 Seeding database...")
 
+        if kwargs["scale"]:
+            self.seed_at_scale(**kwargs)
+            return
+
         self.create_categories()
         self.create_products()
 
         self.stdout.write(self.style.SUCCESS("✅ Seeding completed successfully"))
 
+    def seed_at_scale(self, scale, seed, workers, batch_size, no_copy, flush, **kwargs):
+        if flush:
+            seeding.flush()
+            self.stdout.write("✔ Existing data removed")
+
+        counts = seeding.seed_at_scale(
+            scale=scale,
+            seed=seed,
+            workers=workers,
+            batch_size=batch_size,
+            use_copy=not no_copy,
+            log=self.stdout.write,
+        )
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(f"✅ Seeding completed successfully ({total} rows)"))
+
     def create_categories(self):
         Category.objects.all().delete()
 
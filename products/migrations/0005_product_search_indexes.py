@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-18 12:20
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def search_indexes():
+    return [
+        # Same expression as products.search.product_search_vector()
+        GinIndex(
+            SearchVector("name", weight="A", config="english")
+            + SearchVector("description", weight="B", config="english"),
+            name="product_search_vector_idx",
+        ),
+        GinIndex(
+            fields=["name"],
+            opclasses=["gin_trgm_ops"],
+            name="product_name_trgm_idx",
+        ),
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    # Full-text and trigram indexes only exist on PostgreSQL
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Product = apps.get_model("products", "Product")
+    for index in search_indexes():
+        schema_editor.add_index(Product, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Product = apps.get_model("products", "Product")
+    for index in search_indexes():
+        schema_editor.remove_index(Product, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_created_id_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -5,11 +5,14 @@ class Category(models.Model):
     slug = models.SlugField(unique=True)
     theme = models.CharField(max_length=30)  # food, drinks, clothes, gaming
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
 class Product(models.Model):
+    # Supplier stock-keeping unit; the key bulk imports upsert on
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     name = models.CharField(max_length=150)
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=8, decimal_places=2)
@@ -21,7 +24,16 @@ class Product(models.Model):
     #image = models.ImageField(upload_to="products/", blank=True, null=True)
     image = models.URLField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    # Units on hand; None means stock is not tracked for this product
+    stock = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination seeks on (created_at, id)
+            models.Index(fields=["created_at", "id"], name="product_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,81 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+SEARCH_CONFIG = "english"
+
+# Search results are ranked, so they are capped instead of keyset paginated
+SEARCH_RESULT_LIMIT = 50
+
+
+def product_search_vector():
+    # Must stay identical to the expression indexed in
+    # migrations/0005_product_search_indexes.py or PostgreSQL won't use the index
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+    )
+
+
+def search_terms(text):
+    return re.findall(r"\w+", text)
+
+
+def search_products(queryset, text, limit=SEARCH_RESULT_LIMIT):
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor == "postgresql":
+        queryset = _postgres_search(queryset, text, terms)
+    else:
+        queryset = _fallback_search(queryset, text, terms)
+
+    return queryset[:limit]
+
+
+def _postgres_search(queryset, text, terms):
+    # Every word is a prefix match, so "gam mou" finds "Gaming Mouse"
+    query = SearchQuery(
+        " & ".join(f"{term}:*" for term in terms),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+    vector = product_search_vector()
+
+    return (
+        queryset
+        .alias(search=vector)
+        .annotate(rank=SearchRank(vector, query) + TrigramSimilarity("name", text))
+        # Trigram similarity on the name catches typos the tsquery misses
+        .filter(Q(search=query) | Q(name__trigram_similar=text))
+        .order_by("-rank", "id")
+    )
+
+
+def _fallback_search(queryset, text, terms):
+    # SQLite (local development and tests): substring matching on both fields
+    match = Q()
+    for term in terms:
+        match &= Q(name__icontains=term) | Q(description__icontains=term)
+
+    return (
+        queryset
+        .filter(match)
+        .annotate(
+            rank=Case(
+                When(name__istartswith=text, then=Value(3)),
+                When(name__icontains=text, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("-rank", "id")
+    )
@@ -0,0 +1,473 @@
+"""
+Large-scale synthetic data for load and benchmark testing.
+
+Row generation is split into fixed-size chunks that are handed to a
+process pool. Every chunk seeds its own Faker and Random from the run
+seed and the chunk number, so the same ``--seed``/``--scale`` produces
+the same rows no matter how many workers are used. Timestamps are spread
+over the year before the run and ids continue from the existing rows, so
+only those two differ between runs.
+
+Primary keys for products, users and orders are assigned up front so
+carts, addresses and order items can reference them without reading
+anything back. Rows are written with ``COPY`` on PostgreSQL (psycopg2)
+and with batched multi-row ``INSERT`` everywhere else.
+"""
+import csv
+import io
+import os
+import random
+from bisect import bisect_left
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+from multiprocessing import Pool
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+
+from analytics.models import DailyCategorySales, DailyProductSales, DailySales
+from analytics.rollups import rebuild_rollups
+from cart.models import CartItem
+from coupons.models import CouponRedemption
+from orders.models import Order, OrderItem
+from products.cache import bump_generation
+from products.models import Category, Product
+from users.models import Address
+
+# Rows generated per unit of --scale
+PRODUCTS_PER_SCALE = 10_000
+USERS_PER_SCALE = 2_000
+ORDERS_PER_SCALE = 5_000
+
+CHUNK_SIZE = 5_000
+ZIPF_EXPONENT = 1.1
+HISTORY_DAYS = 365
+SEED_EMAIL_DOMAIN = "seed.example.com"
+SEED_PASSWORD = "password123"
+
+CATEGORIES = [
+    ("Electronics", "gaming"),
+    ("Fashion", "clothes"),
+    ("Books", "education"),
+    ("Home & Kitchen", "home"),
+    ("Sports & Fitness", "fitness"),
+    ("Beauty", "beauty"),
+    ("Toys & Games", "gaming"),
+    ("Grocery", "food"),
+    ("Beverages", "drinks"),
+    ("Footwear", "clothes"),
+    ("Furniture", "home"),
+    ("Garden & Outdoors", "home"),
+    ("Automotive", "tools"),
+    ("Pet Supplies", "pets"),
+    ("Health", "fitness"),
+    ("Jewellery", "clothes"),
+    ("Office Supplies", "education"),
+    ("Baby", "kids"),
+    ("Music", "education"),
+    ("Video Games", "gaming"),
+]
+
+# Order status mix for generated history, roughly what a mature store sees
+STATUS_WEIGHTS = [
+    ("delivered", 70),
+    ("shipped", 8),
+    ("out_for_delivery", 4),
+    ("packing", 4),
+    ("placed", 6),
+    ("cancelled", 8),
+]
+
+GST_RATE = Decimal("0.05")
+CENT = Decimal("0.01")
+
+PRODUCT_FIELDS = (
+    "id", "name", "description", "price", "category_id", "image",
+    "is_active", "stock", "created_at", "updated_at",
+)
+USER_FIELDS = (
+    "id", "password", "is_superuser", "email", "name", "is_active",
+    "is_staff", "date_joined",
+)
+ADDRESS_FIELDS = (
+    "user_id", "full_name", "phone", "street", "city", "state", "pincode",
+    "landmark", "is_default", "created_at",
+)
+CART_FIELDS = ("user_id", "product_id", "quantity", "added_at")
+ORDER_FIELDS = (
+    "id", "user_id", "subtotal", "gst", "discount", "total", "address_text",
+    "status", "created_at", "updated_at",
+)
+ORDER_ITEM_FIELDS = ("order_id", "product_id", "quantity", "price")
+
+
+class ZipfSampler:
+    """Draws ids with probability proportional to 1 / rank ** exponent."""
+
+    def __init__(self, ids, exponent=ZIPF_EXPONENT):
+        self.ids = ids
+        self.cum_weights = list(accumulate(1 / rank ** exponent for rank in range(1, len(ids) + 1)))
+        self.total = self.cum_weights[-1]
+
+    def sample(self, rng):
+        return self.ids[bisect_left(self.cum_weights, rng.random() * self.total)]
+
+    def sample_distinct(self, rng, k):
+        k = min(k, len(self.ids))
+        picked = set()
+        while len(picked) < k:
+            picked.add(self.sample(rng))
+        return sorted(picked)
+
+
+def chunk_seed(seed, stream, index):
+    return (seed * 1_000_003 + stream * 10_007 + index) & 0xFFFFFFFF
+
+
+def chunk_tasks(first_id, count, stream, seed):
+    """Split ``count`` consecutive ids into (seed, start, size) tasks."""
+    return [
+        (chunk_seed(seed, stream, index), first_id + offset, min(CHUNK_SIZE, count - offset))
+        for index, offset in enumerate(range(0, count, CHUNK_SIZE))
+    ]
+
+
+def past_timestamp(rng, now):
+    return now - timedelta(seconds=rng.random() * HISTORY_DAYS * 86400)
+
+
+# Worker side. Pool workers only ever touch the module-level state below
+# and plain Python/Faker objects, never the ORM.
+
+_state = {}
+
+
+def init_worker(state):
+    _state.clear()
+    _state.update(state)
+    if "product_ids" in state:
+        _state["products"] = ZipfSampler(state["product_ids"])
+    if "user_ids" in state:
+        _state["users"] = ZipfSampler(state["user_ids"])
+
+
+def product_rows(task):
+    seed, start, count = task
+    fake = Faker()
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    now = _state["now"]
+    category_ids = _state["category_ids"]
+
+    rows = []
+    for product_id in range(start, start + count):
+        created_at = past_timestamp(rng, now)
+        rows.append((
+            product_id,
+            fake.catch_phrase()[:150],
+            fake.paragraph(nb_sentences=4),
+            Decimal(rng.randint(9900, 999900)) / 100,
+            rng.choice(category_ids),
+            f"https://picsum.photos/seed/{product_id}/400/400",
+            True,
+            rng.randint(50, 500),
+            created_at,
+            created_at,
+        ))
+    return rows
+
+
+def user_rows(task):
+    """Users plus their addresses and (for some of them) a live cart."""
+    seed, start, count = task
+    fake = Faker("en_IN")
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    now = _state["now"]
+    password = _state["password"]
+    products = _state["products"]
+
+    users, addresses, cart_items = [], [], []
+    for user_id in range(start, start + count):
+        name = fake.name()[:100]
+        joined = past_timestamp(rng, now)
+        users.append((
+            user_id, password, False, f"user{user_id}@{SEED_EMAIL_DOMAIN}",
+            name, True, False, joined,
+        ))
+
+        for index in range(rng.choice((1, 1, 1, 2, 2, 3))):
+            addresses.append((
+                user_id,
+                name if index == 0 else fake.name()[:100],
+                fake.msisdn()[:10],
+                fake.street_address(),
+                fake.city()[:50],
+                fake.state()[:50],
+                fake.postcode()[:10],
+                fake.street_name()[:100] if rng.random() < 0.5 else "",
+                index == 0,
+                joined,
+            ))
+
+        if rng.random() < 0.4:
+            for product_id in products.sample_distinct(rng, rng.randint(1, 6)):
+                cart_items.append((
+                    user_id, product_id, rng.choice((1, 1, 1, 2, 3)),
+                    past_timestamp(rng, now),
+                ))
+
+    return users, addresses, cart_items
+
+
+def order_rows(task):
+    seed, start, count = task
+    fake = Faker("en_IN")
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    now = _state["now"]
+    prices = _state["prices"]
+    first_product_id = _state["first_product_id"]
+    products = _state["products"]
+    users = _state["users"]
+    statuses, status_weights = zip(*STATUS_WEIGHTS)
+
+    orders, items = [], []
+    for order_id in range(start, start + count):
+        subtotal = Decimal(0)
+        for product_id in products.sample_distinct(rng, rng.choice((1, 1, 2, 2, 3, 4, 5))):
+            quantity = rng.choice((1, 1, 1, 2, 3))
+            price = Decimal(prices[product_id - first_product_id]) / 100
+            subtotal += price * quantity
+            items.append((order_id, product_id, quantity, price))
+
+        gst = (subtotal * GST_RATE).quantize(CENT)
+        created_at = past_timestamp(rng, now)
+        orders.append((
+            order_id,
+            users.sample(rng),
+            subtotal,
+            gst,
+            Decimal("0.00"),
+            subtotal + gst,
+            fake.address().replace("\n", ", "),
+            rng.choices(statuses, status_weights)[0],
+            created_at,
+            created_at,
+        ))
+    return orders, items
+
+
+# Writers
+
+class RowWriter:
+    """Writes tuples of raw column values to a model's table."""
+
+    NULL = "\\N"
+
+    def __init__(self, use_copy=True, batch_size=2_000):
+        self.batch_size = batch_size
+        self.use_copy = use_copy and connection.vendor == "postgresql" and self.supports_copy()
+
+    @staticmethod
+    def supports_copy():
+        with connection.cursor() as cursor:
+            return hasattr(cursor.cursor, "copy_expert")
+
+    def write(self, model, fields, rows):
+        if not rows:
+            return
+        if self.use_copy:
+            self.copy(model, fields, rows)
+        else:
+            self.insert(model, fields, rows)
+
+    def insert(self, model, fields, rows):
+        # Plain INSERTs rather than bulk_create, whose auto_now/auto_now_add
+        # pre_save would replace the generated timestamps with the current time
+        model_fields = [model._meta.get_field(name) for name in fields]
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(field.column) for field in model_fields)
+        # Rows per INSERT, kept under SQLite's 999 parameter limit
+        size = max(1, min(self.batch_size, 999 // len(fields)))
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), size):
+                batch = rows[start:start + size]
+                placeholders = ", ".join(["(" + ", ".join(["%s"] * len(fields)) + ")"] * len(batch))
+                cursor.execute(
+                    f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES {placeholders}",
+                    [
+                        field.get_db_prep_save(value, connection)
+                        for row in batch
+                        for field, value in zip(model_fields, row)
+                    ],
+                )
+
+    def copy(self, model, fields, rows):
+        buffer = io.StringIO()
+        # Strings are always quoted so empty strings survive; NULLs are
+        # written as \N and turned back into NULL by FORCE_NULL.
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows:
+            writer.writerow(
+                self.NULL if value is None else value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row
+            )
+        buffer.seek(0)
+
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(model._meta.get_field(name).column) for name in fields)
+        sql = (
+            f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{self.NULL}', FORCE_NULL ({columns}))"
+        )
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(sql, buffer)
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+
+def reset_sequences(*models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def flush():
+    """Remove catalog, carts, orders, coupon redemptions and previously generated users."""
+    User = get_user_model()
+    seeded_users = User.objects.filter(email__endswith=f"@{SEED_EMAIL_DOMAIN}")
+
+    # Raw deletes in dependency order: the ORM cascade would load every row
+    # and fire catalog signals once per product.
+    with transaction.atomic():
+        for queryset in (
+            OrderItem.objects.all(),
+            # Their orders and users go too; a raw delete leaves no SET_NULL
+            CouponRedemption.objects.all(),
+            Order.objects.all(),
+            CartItem.objects.all(),
+            DailySales.objects.all(),
+            DailyCategorySales.objects.all(),
+            DailyProductSales.objects.all(),
+            Address.objects.filter(user__in=seeded_users),
+            Product.objects.all(),
+            Category.objects.all(),
+        ):
+            queryset._raw_delete(queryset.db)
+        seeded_users.delete()
+
+
+def seed_categories():
+    ids = []
+    for name, theme in CATEGORIES:
+        category, _ = Category.objects.get_or_create(
+            slug=slugify(name),
+            defaults={"name": name, "theme": theme, "is_active": True},
+        )
+        ids.append(category.id)
+    return ids
+
+
+def run_chunks(worker, tasks, state, workers):
+    """Yield each task's result in task order."""
+    if workers <= 1:
+        init_worker(state)
+        yield from map(worker, tasks)
+        return
+    with Pool(workers, initializer=init_worker, initargs=(state,)) as pool:
+        yield from pool.imap(worker, tasks)
+
+
+def seed_at_scale(scale=1, seed=42, workers=None, batch_size=2_000, use_copy=True, log=print):
+    """Generate ``scale`` units of catalog, users, carts and order history."""
+    workers = workers or os.cpu_count() or 1
+    writer = RowWriter(use_copy=use_copy, batch_size=batch_size)
+    now = timezone.now()
+
+    product_count = max(1, int(PRODUCTS_PER_SCALE * scale))
+    user_count = max(1, int(USERS_PER_SCALE * scale))
+    order_count = int(ORDERS_PER_SCALE * scale)
+
+    counts = {"categories": len(CATEGORIES)}
+    category_ids = seed_categories()
+
+    # Products
+    first_product_id = next_id(Product)
+    state = {"now": now, "category_ids": category_ids}
+    prices = []
+    tasks = chunk_tasks(first_product_id, product_count, 1, seed)
+    for rows in run_chunks(product_rows, tasks, state, workers):
+        with transaction.atomic():
+            writer.write(Product, PRODUCT_FIELDS, rows)
+        prices.extend(int(row[3] * 100) for row in rows)
+    counts["products"] = product_count
+    log(f"✔ {product_count} products created")
+
+    # Popularity rank is a seeded shuffle, so hot products are spread across
+    # categories and creation dates rather than being the oldest ids.
+    product_ids = list(range(first_product_id, first_product_id + product_count))
+    random.Random(seed).shuffle(product_ids)
+
+    # Users, addresses and carts
+    User = get_user_model()
+    first_user_id = next_id(User)
+    state = {
+        "now": now,
+        "password": make_password(SEED_PASSWORD),
+        "product_ids": product_ids,
+    }
+    counts.update(users=0, addresses=0, cart_items=0)
+    tasks = chunk_tasks(first_user_id, user_count, 2, seed)
+    for users, addresses, cart_items in run_chunks(user_rows, tasks, state, workers):
+        with transaction.atomic():
+            writer.write(User, USER_FIELDS, users)
+            writer.write(Address, ADDRESS_FIELDS, addresses)
+            writer.write(CartItem, CART_FIELDS, cart_items)
+        counts["users"] += len(users)
+        counts["addresses"] += len(addresses)
+        counts["cart_items"] += len(cart_items)
+    log(f"✔ {counts['users']} users, {counts['addresses']} addresses, {counts['cart_items']} cart items created")
+
+    # Orders, placed mostly by a small set of heavy buyers
+    user_ids = list(range(first_user_id, first_user_id + user_count))
+    random.Random(seed + 1).shuffle(user_ids)
+    first_order_id = next_id(Order)
+    state = {
+        "now": now,
+        "prices": prices,
+        "first_product_id": first_product_id,
+        "product_ids": product_ids,
+        "user_ids": user_ids,
+    }
+    counts.update(orders=0, order_items=0)
+    tasks = chunk_tasks(first_order_id, order_count, 3, seed)
+    for orders, items in run_chunks(order_rows, tasks, state, workers):
+        with transaction.atomic():
+            writer.write(Order, ORDER_FIELDS, orders)
+            writer.write(OrderItem, ORDER_ITEM_FIELDS, items)
+        counts["orders"] += len(orders)
+        counts["order_items"] += len(items)
+    log(f"✔ {counts['orders']} orders with {counts['order_items']} items created")
+
+    # Ids were assigned explicitly, so move the sequences past them
+    reset_sequences(Product, User, Order, Address, CartItem, OrderItem)
+
+    # Orders were written in bulk, so the sales rollups are built in one pass
+    rollups = rebuild_rollups(batch_size=batch_size)
+    log(f"✔ Sales rollups built for {rollups['days']} days")
+
+    # Bulk writes skip the model signals, so invalidate cached listings here
+    transaction.on_commit(bump_generation)
+    return counts
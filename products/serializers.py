@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from ravoos_pansy.fast_serializers import ValuesSerializer
 from .models import Category, Product
 
 #Category serializer
@@ -31,11 +32,39 @@ class ProductWriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = [
+            "sku",
             "name",
             "description",
             "price",
             "category",
             "image",
+            "stock",
         ]
 
+    def validate_sku(self, value):
+        # Blank means no SKU, so it doesn't collide with other blank ones
+        return value or None
 
+
+#One row of a bulk import (category by slug, sku required). Optional
+#fields have no defaults: a column a row leaves out is left untouched on
+#an existing product, and new products get the model defaults.
+class ProductImportRowSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=64)
+    name = serializers.CharField(max_length=150)
+    description = serializers.CharField(required=False, allow_blank=True)
+    price = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=0)
+    category = serializers.SlugField()
+    image = serializers.URLField(required=False, allow_null=True)
+    # PositiveIntegerField's range on PostgreSQL
+    stock = serializers.IntegerField(required=False, allow_null=True, min_value=0, max_value=2147483647)
+    is_active = serializers.BooleanField(required=False)
+
+
+class ProductImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    type = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+
+
+#Fast read path for the product list (same output as ProductReadSerializer)
+product_values = ValuesSerializer(ProductReadSerializer)
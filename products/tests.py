@@ -1,3 +1,586 @@
+import json
+import tempfile
+from collections import Counter
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+
+from ravoos_pansy.testing import QueryBudgetMixin
+from analytics.models import DailySales
+from cart.models import CartItem
+from coupons.models import Coupon, CouponRedemption
+from orders.models import Order, OrderItem
+from users.models import User
+from . import async_views, views
+from .models import Category, Product
+from .seeding import SEED_EMAIL_DOMAIN
+
+
+def create_products(count, categories):
+    Product.objects.bulk_create(
+        Product(
+            name=f"Product {i}",
+            description="Test product",
+            price="99.00",
+            category=categories[i % len(categories)],
+        )
+        for i in range(count)
+    )
+
+
+class CatalogTestCase(TestCase):
+    def setUp(self):
+        # Catalog responses are cached across requests
+        cache.clear()
+        self.client = APIClient()
+
+
+class ProductReadQueryTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.categories = [
+            Category.objects.create(name=f"Category {i}", slug=f"category-{i}", theme="food")
+            for i in range(5)
+        ]
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_list_query_count_is_constant(self):
+        create_products(10, self.categories)
+        small, response = self.count_queries("/api/products/")
+        self.assertEqual(len(response.json()), 10)
+
+        create_products(10_000 - 10, self.categories)
+        cache.clear()
+        large, response = self.count_queries("/api/products/")
+        self.assertEqual(len(response.json()), 10_000)
+
+        self.assertEqual(small, 2)  # conditional GET validators + product list
+        self.assertEqual(large, small)
+
+    def test_detail_fetches_category_in_same_query(self):
+        create_products(1, self.categories)
+        product = Product.objects.get()
+
+        queries, response = self.count_queries(f"/api/products/{product.pk}/")
+        self.assertEqual(response.json()["category"]["slug"], product.category.slug)
+        self.assertEqual(queries, 1)
+
+
+class ProductKeysetPaginationTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        create_products(25, [category])
+        self.category = category
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            ids.extend(item["id"] for item in page["results"])
+            url = page["next"]
+        return ids
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get("/api/products/")
+        products = response.json()
+        self.assertIsInstance(products, list)
+        self.assertEqual(len(products), 25)
+
+    def test_walks_every_product_once_in_order(self):
+        ids = self.walk("/api/products/?page_size=10")
+        expected = list(
+            Product.objects.order_by("created_at", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_inserts_during_paging_do_not_shift_pages(self):
+        first = self.client.get("/api/products/?page_size=10").json()
+        create_products(5, [self.category])
+
+        rest = self.walk(first["next"])
+        ids = [item["id"] for item in first["results"]] + rest
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 30)
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get("/api/products/?page_size=5")
+        url = response.json()["next"]
+        for _ in range(3):
+            url = self.client.get(url).json()["next"]
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(url)
+        self.assertEqual(len(first.captured_queries), len(deep.captured_queries))
+        self.assertNotIn("OFFSET", deep.captured_queries[-1]["sql"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/products/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+
+class ProductSearchTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name="Gaming", slug="gaming", theme="gaming")
+        Product.objects.create(
+            name="Gaming Mouse", description="High precision RGB mouse",
+            price="1299.00", category=category,
+        )
+        Product.objects.create(
+            name="Mechanical Keyboard", description="Pairs well with any gaming mouse",
+            price="2499.00", category=category,
+        )
+        Product.objects.create(
+            name="Headset", description="Surround sound",
+            price="999.00", category=category,
+        )
+
+    def search(self, term):
+        response = self.client.get("/api/products/", {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return [item["name"] for item in response.json()]
+
+    def test_matches_description_and_ranks_name_matches_first(self):
+        self.assertEqual(self.search("mouse"), ["Gaming Mouse", "Mechanical Keyboard"])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search("gaming keyboard"), ["Mechanical Keyboard"])
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search("head"), ["Headset"])
+
+    def test_punctuation_only_returns_nothing(self):
+        self.assertEqual(self.search("!!"), [])
+
+    def test_search_ignores_pagination(self):
+        response = self.client.get("/api/products/", {"search": "mouse", "page_size": 1})
+        self.assertEqual(len(response.json()), 2)
+
+
+class CatalogCacheTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Food", slug="food", theme="food")
+        create_products(3, [self.category])
+
+    def test_repeat_reads_are_served_from_cache(self):
+        for url in ["/api/products/", "/api/categories/", "/api/products/?page_size=2"]:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(first.json(), second.json())
+
+    def test_query_params_are_cached_separately(self):
+        self.client.get("/api/products/")
+        response = self.client.get("/api/products/", {"category": "missing"})
+        self.assertEqual(response.json(), [])
+
+    def test_product_save_invalidates(self):
+        self.client.get("/api/products/")
+        product = Product.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = "Renamed"
+            product.save()
+        names = [item["name"] for item in self.client.get("/api/products/").json()]
+        self.assertIn("Renamed", names)
+
+    def test_category_delete_invalidates(self):
+        self.client.get("/api/categories/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+        self.assertEqual(self.client.get("/api/categories/").json(), [])
+        self.assertEqual(self.client.get("/api/products/").json(), [])
+
+    def test_generation_survives_eviction(self):
+        from .cache import GENERATION_KEY, get_generation
+
+        before = get_generation()
+        cache.delete(GENERATION_KEY)
+        self.assertGreater(get_generation(), before)
+
+
+class CatalogConditionalGetTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Food", slug="food", theme="food")
+        create_products(3, [self.category])
+
+    def test_etag_round_trip(self):
+        for url in ["/api/products/", "/api/categories/"]:
+            response = self.client.get(url)
+            self.assertIn("ETag", response)
+            self.assertNotIn("Last-Modified", response)
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+    def test_deleting_a_product_changes_etag(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        # Leaves the list without advancing the newest listed updated_at
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.order_by("updated_at").first().delete()
+
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        # Dates are never trusted, however recent
+        response = self.client.get("/api/products/", HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_skips_the_database_when_cached(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_category_rename(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = "Snacks"
+            self.category.save()
+
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_depends_on_query_params(self):
+        first = self.client.get("/api/products/")["ETag"]
+        second = self.client.get("/api/products/", {"page_size": 1})["ETag"]
+        self.assertNotEqual(first, second)
+
+
+class AsyncCatalogViewTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        create_products(30, [category])
+        self.product = Product.objects.first()
+
+    def call_async(self, name, request, **kwargs):
+        return async_to_sync(getattr(async_views, name).as_view())(request, **kwargs)
+
+    def test_views_are_async(self):
+        for name in ("CategoryListView", "ProductListView", "ProductDetailView"):
+            self.assertTrue(getattr(async_views, name).view_is_async)
+
+    def test_responses_match_sync_views(self):
+        pk = self.product.pk
+        cases = [
+            ("CategoryListView", "/api/categories/", {}),
+            ("ProductListView", "/api/products/", {}),
+            ("ProductListView", "/api/products/?page_size=5", {}),
+            ("ProductListView", "/api/products/?category=food&search=Product", {}),
+            ("ProductDetailView", f"/api/products/{pk}/", {"pk": pk}),
+            ("ProductDetailView", "/api/products/999999/", {"pk": 999999}),
+        ]
+        for name, path, kwargs in cases:
+            with self.subTest(path=path):
+                sync = getattr(views, name).as_view()(self.factory.get(path), **kwargs).render()
+                cache.clear()
+                response = self.call_async(name, self.factory.get(path), **kwargs)
+
+                self.assertEqual(response.status_code, sync.status_code)
+                self.assertEqual(response.content, sync.content)
+                self.assertEqual(response.get("ETag"), sync.get("ETag"))
+
+    def test_not_modified_and_cached(self):
+        response = self.call_async("ProductListView", self.factory.get("/api/products/"))
+
+        request = self.factory.get("/api/products/", HTTP_IF_NONE_MATCH=response["ETag"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.call_async("ProductListView", request).status_code, 304)
+
+        with self.assertNumQueries(0):
+            cached = self.call_async("ProductListView", self.factory.get("/api/products/"))
+        self.assertEqual(cached.content, response.content)
+
+
+class ScaledSeedTests(TestCase):
+    def seed(self, *args):
+        call_command("seed", "--scale", "0.02", "--workers", "1", *args, stdout=StringIO())
+
+    def snapshot(self):
+        return (
+            list(Product.objects.order_by("id").values_list("name", "price")),
+            list(Order.objects.order_by("id").values_list("total", "status")),
+            list(CartItem.objects.order_by("user_id", "product_id").values_list("quantity", flat=True)),
+        )
+
+    def test_generates_every_table(self):
+        self.seed()
+
+        self.assertEqual(Category.objects.count(), 20)
+        self.assertEqual(Product.objects.count(), 200)
+        self.assertEqual(User.objects.filter(email__endswith=SEED_EMAIL_DOMAIN).count(), 40)
+        self.assertEqual(Order.objects.count(), 100)
+        self.assertTrue(CartItem.objects.exists())
+        self.assertFalse(OrderItem.objects.filter(product__isnull=True).exists())
+        self.assertEqual(
+            sum(DailySales.objects.values_list("orders", flat=True)),
+            Order.objects.exclude(status="cancelled").count(),
+        )
+
+    def test_keeps_generated_timestamps(self):
+        self.seed()
+
+        for model, field in ((Product, "created_at"), (Order, "created_at"), (CartItem, "added_at")):
+            with self.subTest(model=model.__name__):
+                self.assertGreater(model.objects.values(field).distinct().count(), 10)
+        self.assertGreater(DailySales.objects.count(), 10)
+
+    def test_same_seed_gives_same_data(self):
+        self.seed()
+        first = self.snapshot()
+
+        self.seed("--flush")
+        self.assertEqual(self.snapshot(), first)
+
+        self.seed("--flush", "--seed", "7")
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_flush_removes_coupon_redemptions(self):
+        self.seed()
+        coupon = Coupon.objects.create(code="TEN", percent_off="10")
+        user = User.objects.create_user("buyer@example.com", "Buyer")
+        CouponRedemption.objects.create(coupon=coupon, user=user, order=Order.objects.first())
+
+        self.seed("--flush")
+        self.assertFalse(CouponRedemption.objects.exists())
+        connection.check_constraints()
+
+    def test_product_popularity_is_skewed(self):
+        self.seed()
+        sales = Counter(OrderItem.objects.values_list("product_id", flat=True))
+        top, = sales.most_common(1)
+
+        self.assertGreater(top[1], 5 * sum(sales.values()) / len(sales))
+
+    def test_sequences_continue_after_seeding(self):
+        self.seed()
+        category = Category.objects.first()
+
+        product = Product.objects.create(name="New", price="10.00", category=category)
+        self.assertGreater(product.id, 200)
+
+
+class ProductImportTests(CatalogTestCase):
+    CSV = (
+        "sku,name,price,category,stock,description\n"
+        "A-1,Apple,10.50,food,5,\n"
+        "A-2,Banana,abc,food,,\n"
+        "A-3,Cherry,3.00,missing,,\n"
+        'A-4,Dates,4.00,food,,"Sweet, sticky"\n'
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Food", slug="food", theme="food")
+        self.admin = User.objects.create_user("admin@example.com", "Admin")
+        self.admin.is_staff = True
+        self.admin.save()
+        self.client.force_authenticate(user=self.admin)
+
+    def upload(self, content, type="csv"):
+        return self.client.post(
+            "/api/admin/products/import/",
+            {"file": SimpleUploadedFile(f"feed.{type}", content.encode()), "type": type},
+            format="multipart",
+        )
+
+    def test_csv_reports_bad_rows_and_imports_the_rest(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.upload(self.CSV)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: response.data[key] for key in ("created", "updated", "failed")},
+            {"created": 2, "updated": 0, "failed": 2},
+        )
+        self.assertEqual(
+            [(error["line"], error["sku"], list(error["errors"])) for error in response.data["errors"]],
+            [(3, "A-2", ["price"]), (4, "A-3", ["category"])],
+        )
+
+        apple = Product.objects.get(sku="A-1")
+        self.assertEqual((apple.name, apple.stock, apple.category), ("Apple", 5, self.category))
+        dates = Product.objects.get(sku="A-4")
+        self.assertEqual((dates.description, dates.stock), ("Sweet, sticky", None))
+        # Catalog cache invalidated once for the whole import
+        self.assertEqual(len(callbacks), 1)
+
+    def test_existing_skus_are_updated(self):
+        product = Product.objects.create(sku="A-1", name="Old", price="1.00", category=self.category)
+        feed = "\n".join(json.dumps(row) for row in [
+            {"sku": "A-1", "name": "Apple", "price": "2.00", "category": "food", "is_active": False},
+            {"sku": "A-2", "name": "Banana", "price": "1.00", "category": "food"},
+            {"sku": "A-2", "name": "Banana (ripe)", "price": "1.20", "category": "food"},
+        ]) + "\n{not json\n"
+
+        response = self.upload(feed, type="ndjson")
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 4)
+
+        product.refresh_from_db()
+        self.assertEqual((product.name, str(product.price), product.is_active), ("Apple", "2.00", False))
+        # Last row for a SKU wins
+        self.assertEqual(Product.objects.get(sku="A-2").name, "Banana (ripe)")
+
+    def test_missing_columns_are_left_alone(self):
+        product = Product.objects.create(
+            sku="A-1", name="Burger", price="10.00", category=self.category, description="Juicy",
+            image="https://example.com/burger.jpg", stock=40, is_active=False,
+        )
+        response = self.upload("sku,name,price,category,stock\nA-1,Burger v2,12.00,food,\nA-9,New,1.00,food,7\n")
+        self.assertEqual((response.data["created"], response.data["updated"]), (1, 1))
+
+        product.refresh_from_db()
+        self.assertEqual((product.name, str(product.price)), ("Burger v2", "12.00"))
+        self.assertEqual(
+            (product.description, product.image, product.stock, product.is_active),
+            ("Juicy", "https://example.com/burger.jpg", 40, False),
+        )
+        # New products get the model defaults
+        new = Product.objects.get(sku="A-9")
+        self.assertEqual((new.description, new.image, new.stock, new.is_active), ("", None, 7, True))
+
+    def test_database_errors_fail_only_their_rows(self):
+        from django.db import DataError
+
+        bulk_create = Product.objects.bulk_create
+
+        def failing_bulk_create(products, **kwargs):
+            if any(product.sku == "A-2" for product in products):
+                raise DataError("value out of range")
+            return bulk_create(products, **kwargs)
+
+        feed = "sku,name,price,category\n" + "".join(f"A-{i},Product {i},1.00,food\n" for i in range(4))
+        with mock.patch.object(Product.objects, "bulk_create", side_effect=failing_bulk_create):
+            response = self.upload(feed)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["created"], response.data["failed"]), (3, 1))
+        self.assertEqual(
+            response.data["errors"],
+            [{"line": 4, "sku": "A-2", "errors": {"non_field_errors": ["value out of range"]}}],
+        )
+        self.assertEqual(sorted(Product.objects.values_list("sku", flat=True)), ["A-0", "A-1", "A-3"])
+
+    def test_upserts_in_batches(self):
+        from .importer import csv_rows, import_products
+
+        feed = "sku,name,price,category\n" + "".join(f"S{i},Product {i},1.00,food\n" for i in range(5))
+        # Category lookup, then per batch of 2: savepoint, existing SKUs,
+        # upsert, release
+        with self.assertNumQueries(1 + 3 * 4):
+            report = import_products(csv_rows(StringIO(feed)), batch_size=2)
+        self.assertEqual(report["created"], 5)
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as feed:
+            feed.write(self.CSV)
+        out, err = StringIO(), StringIO()
+        call_command("import_products", feed.name, stdout=out, stderr=err)
+
+        self.assertIn("2 created, 0 updated, 2 failed", out.getvalue())
+        self.assertIn("line 3 (A-2): price:", err.getvalue())
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_staff_only(self):
+        self.admin.is_staff = False
+        self.admin.save()
+        self.assertEqual(self.upload(self.CSV).status_code, 403)
+        self.assertEqual(Product.objects.count(), 0)
+
+
+class ProductQueryBudgetTests(QueryBudgetMixin, CatalogTestCase):
+    urlconf = "products.urls"
+    budgets = {
+        ("GET", "categories/"): 2,
+        ("GET", "products/"): 2,
+        ("GET", "products/<int:pk>/"): 1,
+        ("POST", "admin/products/"): 2,
+        ("PUT", "admin/products/<int:pk>/"): 3,
+        ("DELETE", "admin/products/<int:pk>/delete/"): 5,  # includes its sales rollup rows
+        ("POST", "admin/products/import/"): 5,  # categories, then per batch: savepoint, SKUs, upsert, release
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = [
+            Category.objects.create(name=f"Category {i}", slug=f"category-{i}", theme="food")
+            for i in range(10)
+        ]
+        create_products(1000, cls.categories)
+        cls.admin = User.objects.create_user("admin@example.com", "Admin")
+        cls.admin.is_staff = True
+        cls.admin.save()
+
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.first()
+
+    def test_categories(self):
+        self.assertWithinBudget("GET", "categories/", "/api/categories/")
+
+    def test_product_list(self):
+        for params in ({}, {"page_size": 50}, {"category": "category-3"}, {"search": "product"}):
+            cache.clear()
+            self.assertWithinBudget("GET", "products/", "/api/products/", data=params)
+
+    def test_product_detail(self):
+        self.assertWithinBudget(
+            "GET", "products/<int:pk>/", f"/api/products/{self.product.pk}/"
+        )
+
+    def test_admin_create(self):
+        self.client.force_authenticate(user=self.admin)
+        self.assertWithinBudget(
+            "POST", "admin/products/", "/api/admin/products/",
+            data={"name": "New", "price": "10.00", "category": self.categories[0].pk},
+        )
+
+    def test_admin_update(self):
+        self.client.force_authenticate(user=self.admin)
+        self.assertWithinBudget(
+            "PUT", "admin/products/<int:pk>/", f"/api/admin/products/{self.product.pk}/",
+            data={"name": "Renamed", "price": "10.00", "category": self.categories[1].pk},
+        )
+
+    def test_admin_delete(self):
+        self.client.force_authenticate(user=self.admin)
+        self.assertWithinBudget(
+            "DELETE", "admin/products/<int:pk>/delete/",
+            f"/api/admin/products/{self.product.pk}/delete/",
+        )
+
+    def test_admin_import(self):
+        self.client.force_authenticate(user=self.admin)
+        # Few enough rows that SQLite's parameter limit doesn't split the INSERT
+        feed = "sku,name,price,category\n" + "".join(
+            f"SKU{i},Product {i},1.00,category-{i % 10}\n" for i in range(50)
+        )
+        self.assertWithinBudget(
+            "POST", "admin/products/import/", "/api/admin/products/import/",
+            data={"file": SimpleUploadedFile("feed.csv", feed.encode())}, format="multipart",
+        )
 
-# Create your tests here.
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     CategoryListView,
@@ -6,8 +7,12 @@ from .views import (
     AdminProductCreateView,
     AdminProductUpdateView,
     AdminProductDeleteView,
+    AdminProductImportView,
 )
 
+if settings.ASYNC_VIEWS:
+    from .async_views import CategoryListView, ProductListView, ProductDetailView
+
 urlpatterns = [
     path("categories/", CategoryListView.as_view()),
     path("products/", ProductListView.as_view()),
@@ -17,4 +22,5 @@ urlpatterns = [
     path("admin/products/", AdminProductCreateView.as_view()),
     path("admin/products/<int:pk>/", AdminProductUpdateView.as_view()),
     path("admin/products/<int:pk>/delete/", AdminProductDeleteView.as_view()),
+    path("admin/products/import/", AdminProductImportView.as_view()),
 ]
@@ -1,30 +1,67 @@
+import codecs
+
 from rest_framework.generics import ListAPIView, RetrieveAPIView, CreateAPIView, UpdateAPIView, DestroyAPIView
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from .models import Product, Category
-from .serializers import CategorySerializer, ProductWriteSerializer, ProductReadSerializer
+from .serializers import (
+    CategorySerializer,
+    ProductImportSerializer,
+    ProductWriteSerializer,
+    ProductReadSerializer,
+    product_values,
+)
+from .importer import IMPORT_FORMATS, import_products
 from .permissions import IsAdmin
+from .search import search_products
+from .cache import CatalogCacheMixin
+from ravoos_pansy.conditional import ConditionalGetMixin
+from ravoos_pansy.fast_serializers import ValuesListMixin
+from ravoos_pansy.pagination import KeysetPagination
+
+def active_products():
+    # Category is nested in the read serializer, so join it up front
+    return Product.objects.filter(is_active=True).select_related("category")
+
+
+def filter_products(queryset, params):
+    category = params.get("category")
+    search = params.get("search")
+
+    if category:
+        queryset = queryset.filter(category__slug=category)
+
+    if search:
+        queryset = search_products(queryset, search)
+
+    return queryset
 
-class CategoryListView(ListAPIView):
+
+class CategoryListView(CatalogCacheMixin, ConditionalGetMixin, ListAPIView):
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
 
-class ProductListView(ListAPIView):
+class ProductListView(CatalogCacheMixin, ConditionalGetMixin, ValuesListMixin, ListAPIView):
     serializer_class = ProductReadSerializer
+    values_serializer = product_values
+    # Only selected for the pagination cursor
+    values_extra = ("created_at",)
+    pagination_class = KeysetPagination
+    # Products embed their category, so a category edit changes the list too
+    conditional_timestamp_fields = ("updated_at", "category__updated_at")
 
     def get_queryset(self):
-        queryset = Product.objects.filter(is_active=True)
-        category = self.request.query_params.get("category")
-        search = self.request.query_params.get("search")
-
-        if category:
-            queryset = queryset.filter(category__slug=category)
+        return filter_products(active_products(), self.request.query_params)
 
-        if search:
-            queryset = queryset.filter(name__icontains=search)
-
-        return queryset
+    def paginate_queryset(self, queryset):
+        # Ranked search results are already capped, keyset paging is for browsing
+        if self.request.query_params.get("search"):
+            return None
+        return super().paginate_queryset(queryset)
 
 class ProductDetailView(RetrieveAPIView):
-    queryset = Product.objects.filter(is_active=True)
+    queryset = active_products()
     serializer_class = ProductReadSerializer
 
 
@@ -43,3 +80,20 @@ class AdminProductUpdateView(UpdateAPIView):
 class AdminProductDeleteView(DestroyAPIView):
     permission_classes = [IsAdmin]
     queryset = Product.objects.all()
+
+class AdminProductImportView(APIView):
+    permission_classes = [IsAdmin]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = ProductImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        rows = IMPORT_FORMATS[serializer.validated_data["type"]]
+
+        # Large uploads are spooled to disk by Django and read line by line
+        try:
+            report = import_products(rows(codecs.iterdecode(upload, "utf-8-sig")))
+        except UnicodeDecodeError:
+            return Response({"error": "File must be UTF-8 encoded"}, status=400)
+        return Response(report)
@@ -0,0 +1,49 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines, for serving read paths under ASGI.
+
+    DRF's own dispatch is synchronous, so this one awaits the handler and
+    reuses the rest of APIView unchanged: authentication, permissions,
+    exception handling and rendering behave exactly like the sync views and
+    produce the same bytes. Authentication may hit the token table, so it
+    runs in a thread; handlers use the async ORM.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        if isinstance(self.response, Response):
+            # Render here; left to Django, rendering would be pushed to a thread
+            self.response.render()
+            return HttpResponse(
+                self.response.content,
+                status=self.response.status_code,
+                headers=self.response.headers,
+            )
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
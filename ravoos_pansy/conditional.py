@@ -0,0 +1,95 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def queryset_etag(request, queryset, timestamp_fields=("updated_at",), related_counts=()):
+    """
+    Compute the ETag for a response listing ``queryset``.
+
+    Uses a single aggregate (row count and newest timestamps) instead of
+    serializing the body: any insert, delete or update to a listed row
+    changes the result. The ETag also covers the URL and the user, since
+    both change what the body contains.
+
+    ``related_counts`` are lookups (e.g. ``"items"``) counted in the same
+    query, for bodies that embed related rows without a timestamp of their
+    own: adding, removing or nulling one of them changes the ETag.
+
+    There is deliberately no Last-Modified: a row deleted or filtered out
+    of the list (deactivated, moved to another category) doesn't advance
+    the newest timestamp, so If-Modified-Since would answer 304 for a
+    stale list. The count in the ETag catches those changes.
+    """
+    queryset, aggregates = etag_aggregates(queryset, timestamp_fields, related_counts)
+    return build_etag(request, queryset.aggregate(**aggregates), timestamp_fields, related_counts)
+
+
+async def aqueryset_etag(request, queryset, timestamp_fields=("updated_at",), related_counts=()):
+    queryset, aggregates = etag_aggregates(queryset, timestamp_fields, related_counts)
+    return build_etag(request, await queryset.aaggregate(**aggregates), timestamp_fields, related_counts)
+
+
+def etag_aggregates(queryset, timestamp_fields, related_counts=()):
+    if not queryset.query.is_sliced:
+        queryset = queryset.order_by()
+    aggregates = {
+        # Related lookups join their rows in, so count listed rows distinctly
+        "count": Count("pk", distinct=bool(related_counts)),
+        **{f"max_{i}": Max(field) for i, field in enumerate(timestamp_fields)},
+        **{f"count_{i}": Count(lookup) for i, lookup in enumerate(related_counts)},
+    }
+    return queryset, aggregates
+
+
+def build_etag(request, stats, timestamp_fields, related_counts=()):
+    stamps = [stats[f"max_{i}"] for i in range(len(timestamp_fields))]
+
+    parts = [
+        request.build_absolute_uri(),
+        str(request.user.pk),
+        str(stats["count"]),
+        *(stamp.isoformat() if stamp else "" for stamp in stamps),
+        *(str(stats[f"count_{i}"]) for i in range(len(related_counts))),
+    ]
+    return quote_etag(hashlib.sha1("|".join(parts).encode()).hexdigest())
+
+
+def not_modified_response(request, etag):
+    """Return a 304 response if the client's copy is current, else None."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_etag_header(response, etag)
+    return response
+
+
+def set_etag_header(response, etag):
+    response["ETag"] = etag
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET (If-None-Match) for list views.
+
+    The ETag is checked before the list is fetched and serialized, so an
+    unchanged list costs one aggregate query and an empty 304.
+    """
+
+    conditional_timestamp_fields = ("updated_at",)
+
+    def get_etag(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset_etag(request, queryset, self.conditional_timestamp_fields)
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        set_etag_header(response, etag)
+        return response
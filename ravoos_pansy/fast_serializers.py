@@ -0,0 +1,211 @@
+"""
+Read-only fast path for the hot list endpoints.
+
+A ValuesSerializer is compiled once from an existing ModelSerializer. It
+fetches rows with ``.values()`` and builds the response dicts directly, so
+there is no serializer or field binding per object and no model instances
+at all. The output matches the ModelSerializer's byte for byte (see the
+parity tests), so responses and cache entries are interchangeable.
+
+Supported: plain model fields, primary-key related fields, nested
+serializers over forward relations and ``many=True`` nested serializers
+over reverse foreign keys (one extra query, children in id order).
+"""
+import decimal
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import serializer_timer
+
+# Fields whose to_representation() is the identity for database values
+PASSTHROUGH = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.RelatedField,
+)
+
+# How a plan entry turns a row into an output value
+VALUE, CONVERT, FILE, DATETIME, NESTED, MANY = range(6)
+
+
+def decimal_string(field):
+    """
+    DecimalField.to_representation() with the quantize exponent and
+    context built once instead of per value.
+    """
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.decimal_places is None or field.normalize_output or field.localize or not coerce_to_string:
+        return field.to_representation
+
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return f"{value.quantize(exponent, rounding=rounding, context=context):f}"
+    return convert
+
+
+def iso_datetime(field):
+    """
+    DateTimeField.to_representation() for the default ISO 8601 output,
+    taking the current timezone as an argument so it is looked up once
+    per response. Returns None when the field is configured otherwise.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, "timezone"):
+        return None
+
+    def convert(value, tz):
+        if tz is None:
+            return field.to_representation(value)
+        if timezone.is_aware(value):
+            value = value.astimezone(tz)
+        else:
+            value = timezone.make_aware(value, tz)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+    return convert
+
+
+def file_url(storage):
+    # FileField.to_representation() on the stored name, without the FieldFile
+    def convert(name, request):
+        if not name:
+            return None
+        url = storage.url(name)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+    return convert
+
+
+class ValuesSerializer:
+    def __init__(self, serializer_class, prefix=""):
+        self.model = serializer_class.Meta.model
+        self.lookups = []
+        self.plan = []
+        self.children = []
+
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*":
+                raise TypeError(f"{serializer_class.__name__}.{name} has no model source")
+            lookup = prefix + field.source.replace(".", "__")
+
+            if isinstance(field, serializers.ListSerializer):
+                relation = self.model._meta.get_field(field.source)
+                child = ValuesSerializer(type(field.child))
+                self.children.append((name, relation.field.name, child))
+                self.plan.append((MANY, name, None, None))
+                continue
+
+            if isinstance(field, serializers.BaseSerializer):
+                nested = ValuesSerializer(type(field), prefix=lookup + "__")
+                self.lookups.extend(nested.lookups)
+                self.plan.append((NESTED, name, None, nested))
+                continue
+
+            if isinstance(field, serializers.FileField):
+                storage = self.model._meta.get_field(field.source).storage
+                self.plan.append((FILE, name, lookup, file_url(storage)))
+            elif isinstance(field, PASSTHROUGH):
+                self.plan.append((VALUE, name, lookup, None))
+            elif isinstance(field, serializers.DecimalField):
+                self.plan.append((CONVERT, name, lookup, decimal_string(field)))
+            elif isinstance(field, serializers.DateTimeField) and iso_datetime(field):
+                self.plan.append((DATETIME, name, lookup, iso_datetime(field)))
+            else:
+                self.plan.append((CONVERT, name, lookup, field.to_representation))
+            self.lookups.append(lookup)
+
+        if self.children and "pk" not in self.lookups:
+            self.lookups.append("pk")
+
+    def values(self, queryset, *extra):
+        """``queryset.values()`` with every column the output needs."""
+        return queryset.values(*self.lookups, *extra)
+
+    def serialize(self, rows, request=None):
+        """Response data for rows from values(); one query per many=True field."""
+        with serializer_timer(request):
+            rows = list(rows)
+            tz = timezone.get_current_timezone() if settings.USE_TZ else None
+            data = [self.build(row, request, tz) for row in rows]
+
+            for name, fk, child in self.children:
+                grouped = {row["pk"]: [] for row in rows}
+                if grouped:
+                    child_rows = child.values(
+                        child.model.objects.filter(**{f"{fk}__in": list(grouped)}).order_by("pk"),
+                        fk,
+                    )
+                    for child_row in child_rows:
+                        grouped[child_row[fk]].append(child.build(child_row, request, tz))
+                for row, item in zip(rows, data):
+                    item[name] = grouped[row["pk"]]
+        return data
+
+    def serialize_chunks(self, rows, request=None, chunk_size=500):
+        """Like serialize(), but yields one list per ``chunk_size`` rows."""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield self.serialize(chunk, request)
+                chunk = []
+        if chunk:
+            yield self.serialize(chunk, request)
+
+    def build(self, row, request, tz):
+        item = {}
+        for kind, name, lookup, convert in self.plan:
+            if kind == VALUE:
+                item[name] = row[lookup]
+            elif kind == NESTED:
+                item[name] = convert.build(row, request, tz)
+            elif kind == MANY:
+                # Filled in by serialize(); set now to keep the key order
+                item[name] = None
+            else:
+                value = row[lookup]
+                if value is None:
+                    item[name] = None
+                elif kind == FILE:
+                    item[name] = convert(value, request)
+                elif kind == DATETIME:
+                    item[name] = convert(value, tz)
+                else:
+                    item[name] = convert(value)
+        return item
+
+
+class ValuesListMixin:
+    """
+    ``list()`` for a ListAPIView through ``values_serializer`` instead of
+    ``serializer_class``. Goes after caching/conditional mixins in the bases.
+    """
+
+    values_serializer = None
+    values_extra = ()
+
+    def list(self, request, *args, **kwargs):
+        fast = self.values_serializer
+        queryset = fast.values(self.filter_queryset(self.get_queryset()), *self.values_extra)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page, request))
+        return Response(fast.serialize(queryset, request))
@@ -0,0 +1,103 @@
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "HTTP_IDEMPOTENCY_KEY"
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    payload = f"{request.method}|{request.path}|{body}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotent(handler):
+    """
+    Honor an ``Idempotency-Key`` header on a view handler.
+
+    The first request with a key runs normally and its status and data are
+    stored for ``IDEMPOTENCY_KEY_TTL`` seconds. A retry with the same key and
+    payload gets the stored response back without running the handler
+    again. Reusing a key for a different payload is rejected with 422, and
+    a retry that arrives while the first attempt is still running gets 409.
+    Keys are scoped per user, and requests without the header are untouched.
+
+    Only one attempt runs because ``cache.add()`` is atomic, and that holds
+    across processes only if they share the cache. LocMemCache (the default
+    without REDIS_URL) is per process, where a retry reaching another
+    worker would run the handler again; settings and gunicorn.conf.py
+    therefore refuse to run more than one worker without a shared cache.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return handler(self, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": "Idempotency-Key is too long"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cache = caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        cache_key = f"idempotency:{request.user.pk}:{digest}"
+        fingerprint = request_fingerprint(request)
+
+        # add() is atomic, so only one concurrent attempt claims the key
+        claimed = cache.add(
+            cache_key,
+            {"fingerprint": fingerprint, "status": None},
+            settings.IDEMPOTENCY_LOCK_TIMEOUT,
+        )
+        if not claimed:
+            return replay(cache.get(cache_key), fingerprint)
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code >= 500:
+            # Server errors are worth retrying for real
+            cache.delete(cache_key)
+        else:
+            cache.set(
+                cache_key,
+                {
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "data": response.data,
+                },
+                settings.IDEMPOTENCY_KEY_TTL,
+            )
+        return response
+
+    return wrapper
+
+
+def replay(stored, fingerprint):
+    if stored is None or stored["status"] is None:
+        return Response(
+            {"error": "A request with this Idempotency-Key is still in progress"},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {"error": "Idempotency-Key was already used for a different request"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+
+    response = Response(stored["data"], status=stored["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
@@ -0,0 +1,225 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# name -> (help text, buckets)
+METRICS = {
+    "request_duration_seconds": ("Wall time per request", SECONDS_BUCKETS),
+    "db_duration_seconds": ("Time spent in SQL per request", SECONDS_BUCKETS),
+    "app_duration_seconds": ("View time per request, excluding SQL, serialization and rendering", SECONDS_BUCKETS),
+    "serialize_duration_seconds": ("Serializer time per request, excluding SQL", SECONDS_BUCKETS),
+    "render_duration_seconds": ("Response rendering time per request", SECONDS_BUCKETS),
+    "db_queries": ("SQL queries per request", QUERY_BUCKETS),
+}
+PREFIX = "ravoos_"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Per-route request histograms, kept in process memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, method, route, values):
+        with self._lock:
+            histograms = self._routes.get((method, route))
+            if histograms is None:
+                histograms = {name: Histogram(buckets) for name, (_, buckets) in METRICS.items()}
+                self._routes[(method, route)] = histograms
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        """Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+            for name, (help_text, buckets) in METRICS.items():
+                metric = PREFIX + name
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for (method, route), histograms in routes:
+                    histogram = histograms[name]
+                    labels = f'method="{method}",route="{escape_label(route)}"'
+                    cumulative = 0
+                    for bound, count in zip(buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.total}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+class RequestStats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+        self.render_start = None
+        self.render_time = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+@contextmanager
+def serializer_timer(request):
+    """
+    Count the enclosed block as serialization for the request's metrics,
+    minus any SQL it runs (lazy querysets, nested many=True fields). A
+    no-op when metrics are off or the block is inside another timer.
+    """
+    stats = getattr(request, "_request_stats", None)
+    if stats is None or stats.serializing:
+        yield
+        return
+    stats.serializing = True
+    start, db_time = time.perf_counter(), stats.db_time
+    try:
+        yield
+    finally:
+        stats.serializing = False
+        stats.serialize_time += time.perf_counter() - start - (stats.db_time - db_time)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, SQL time, serializer time, view time, render time
+    and wall time for every request. They are sent back in a Server-Timing
+    header and aggregated per route for /api/_metrics/.
+
+    Streaming responses are left out: their body, and its queries, are
+    produced after the middleware returns, so the numbers would be wrong.
+
+    Works as sync or async middleware, so ASGI requests to async views
+    don't pay for a thread hop. Enabled with REQUEST_METRICS_ENABLED. When
+    disabled, the middleware removes itself at startup (MiddlewareNotUsed),
+    so it costs nothing.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = request._request_stats = RequestStats()
+        with self.recording(stats):
+            response = self.get_response(request)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = request._request_stats = RequestStats()
+        with self.recording(stats):
+            response = await self.get_response(request)
+        return self.finish(request, response, stats)
+
+    @staticmethod
+    def recording(stats):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats.record_query))
+        return stack
+
+    def finish(self, request, response, stats):
+        if response.streaming:
+            return response
+
+        wall = time.perf_counter() - stats.start
+        app = max(wall - stats.db_time - stats.serialize_time - stats.render_time, 0.0)
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"',
+            f"serialize;dur={stats.serialize_time * 1000:.2f}",
+            f"app;dur={app * 1000:.2f}",
+            f"render;dur={stats.render_time * 1000:.2f}",
+            f"total;dur={wall * 1000:.2f}",
+        ])
+
+        match = request.resolver_match
+        registry.observe(
+            request.method,
+            match.route if match else "unmatched",
+            {
+                "request_duration_seconds": wall,
+                "db_duration_seconds": stats.db_time,
+                "serialize_duration_seconds": stats.serialize_time,
+                "app_duration_seconds": app,
+                "render_duration_seconds": stats.render_time,
+                "db_queries": stats.queries,
+            },
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF responses are rendered
+        stats = request._request_stats
+        stats.render_start = time.perf_counter()
+
+        def render_done(rendered):
+            stats.render_time = time.perf_counter() - stats.render_start
+
+        response.add_post_render_callback(render_done)
+        return response
+
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise Http404
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4")
@@ -0,0 +1,104 @@
+"""
+JSON rendering for the API.
+
+FastJSONRenderer is the default renderer. It uses orjson when it is
+installed (``pip install orjson``), which is several times faster on
+large product and order lists, and DRF's JSONRenderer otherwise.
+JSON_RENDERER_BACKEND picks the backend: "auto" (orjson if available),
+"orjson" or "json" (the stdlib, via DRF).
+
+For what the API sends (strings, Decimals as strings, ints, bools,
+dates, UUIDs) both give the same bytes. Where orjson differs:
+
+- floats with a negative exponent lose the exponent's leading zero
+  (``1.5e-7``, not ``1.5e-07``); both parse to the same number.
+- NaN and Infinity become ``null``, where DRF (STRICT_JSON) raises.
+- ints beyond 64 bits, and anything else orjson can't encode, fall back
+  to JSONRenderer for the whole response.
+
+StreamingJSONResponse sends a very large list as a JSON array in chunks,
+so the whole body never has to be built in memory.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("auto", "orjson", "json")
+
+# Items rendered per chunk of a streamed list
+STREAM_CHUNK_SIZE = 500
+
+# orjson handles str/int/float/list/dict (and their subclasses), UUIDs and
+# dates natively; everything else (Decimal, lazy strings, querysets...)
+# goes through the same fallbacks as DRF's encoder
+_drf_encoder = JSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def use_orjson():
+    backend = settings.JSON_RENDERER_BACKEND
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(f"JSON_RENDERER_BACKEND must be one of {', '.join(BACKENDS)}")
+    if backend == "orjson" and orjson is None:
+        raise ImproperlyConfigured("JSON_RENDERER_BACKEND is orjson, but orjson is not installed")
+    return backend != "json" and orjson is not None
+
+
+def escape_line_separators(content):
+    # Same as DRF: keep the output a strict JavaScript subset
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        # Pretty printing (?indent= / browsable API) and non-default DRF JSON
+        # settings are rare, so they keep using the stdlib encoder
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not use_orjson():
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(data, default=_drf_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return escape_line_separators(content)
+
+
+def iter_json_array(chunks, renderer=None):
+    """
+    Render an iterable of lists as the items of a single JSON array,
+    yielding the bytes one chunk at a time.
+    """
+    renderer = renderer or FastJSONRenderer()
+    yield b"["
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # "[a,b]" -> "a,b", then join chunks with commas
+        body = renderer.render(list(chunk))[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """A JSON array response streamed from an iterable of lists of items."""
+
+    def __init__(self, chunks, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(iter_json_array(chunks), **kwargs)
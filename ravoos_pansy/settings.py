@@ -11,9 +11,12 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
 from dotenv import load_dotenv
 import dj_database_url
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -66,6 +69,7 @@ INSTALLED_APPS = [
     'cart',
     'orders',
     'coupons',
+    'analytics',
 
     'django.contrib.admin',
     'django.contrib.auth',
@@ -73,6 +77,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework.authtoken',
@@ -81,6 +86,7 @@ INSTALLED_APPS = [
 
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -90,6 +96,7 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 MIDDLEWARE = [
+    'ravoos_pansy.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -100,6 +107,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Serve the catalog and cart read endpoints with async views. Only worth it
+# under ASGI (uvicorn workers); under WSGI each async view gets its own event loop.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
+# Per-request SQL/latency metrics (Server-Timing header and /api/_metrics/)
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS", "False") == "True"
+
 ROOT_URLCONF = 'ravoos_pansy.urls'
 
 TEMPLATES = [
@@ -136,14 +150,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 #         'PORT': os.getenv('DB_PORT'),
 #     }
 # }
+# Connections persist for CONN_MAX_AGE seconds and are health-checked
+# before reuse. DB_POOL=<max size> switches PostgreSQL to Django's
+# connection pool instead, which needs psycopg 3 (psycopg[pool]).
 DATABASES = {
     "default": dj_database_url.config(
         default=os.getenv("DATABASE_URL"),
-        conn_max_age=600,
+        conn_max_age=int(os.getenv("CONN_MAX_AGE", "600")),
+        conn_health_checks=True,
         ssl_require=not DEBUG,
     )
 }
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL", "0"))
+if DB_POOL_SIZE and DATABASES["default"].get("ENGINE") == "django.db.backends.postgresql":
+    if importlib.util.find_spec("psycopg_pool") is None:
+        raise ImproperlyConfigured("DB_POOL requires psycopg 3 with the pool extra: pip install 'psycopg[binary,pool]'")
+    # The pool replaces persistent connections; Django rejects both at once
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": min(2, DB_POOL_SIZE),
+        "max_size": DB_POOL_SIZE,
+        "timeout": 10,
+    }
+
+# SQLite: take the write lock when a transaction starts, so concurrent
+# requests wait for each other instead of failing with "database is locked"
+if DATABASES["default"].get("ENGINE") == "django.db.backends.sqlite3":
+    DATABASES["default"].setdefault("OPTIONS", {})["transaction_mode"] = "IMMEDIATE"
+
+
+
+# Cache
+# Local memory by default, which is private to each process; set REDIS_URL
+# to share the cache between workers (gunicorn.conf.py refuses to start
+# more than one worker without it)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ravoos-pansy",
+    }
+}
+
+if os.getenv("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }
+
+# Whether every server process sees the same cache. Idempotency-Key claims
+# (cache.add) and the catalog/coupon generation counters are only correct
+# across processes when it does; gunicorn.conf.py refuses to start more
+# than one worker without it
+SHARED_CACHE = bool(os.getenv("REDIS_URL"))
+
+# Catalog responses are invalidated by a generation counter. Without a
+# shared cache, writes from other processes (import_products, seed) never
+# reach this one's counter, so entries are kept only briefly
+CATALOG_CACHE_ALIAS = "default"
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24 if SHARED_CACHE else 60
+
+# Active coupons are held in-process and reloaded when the generation
+# counter in this cache moves
+COUPON_CACHE_ALIAS = "default"
+
+# Stored responses for Idempotency-Key retries (checkout, add to cart)
+IDEMPOTENCY_CACHE_ALIAS = "default"
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
 
 
 # Password validation
@@ -187,10 +263,28 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'ravoos_pansy.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# JSON encoder behind FastJSONRenderer: auto (orjson when installed), orjson or json
+JSON_RENDERER_BACKEND = os.getenv("JSON_RENDERER_BACKEND", "auto")
+
+# Token auth: resolved tokens are cached in the shared cache when Redis is
+# configured, otherwise in-process for LOCAL_TTL seconds. Tokens never
+# expire unless AUTH_TOKEN_TTL (seconds) is set.
+AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", "0")) or None
+
+AUTH_TOKEN_CACHE = {
+    "MAX_SIZE": 10000,
+    "LOCAL_TTL": 30,
+    "SHARED_ALIAS": "default" if os.getenv("REDIS_URL") else None,
+    "SHARED_TTL": 300,
+}
@@ -0,0 +1,51 @@
+import time
+from importlib import import_module
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Assert that API calls stay within a fixed query and latency budget.
+
+    Subclasses seed realistic data volumes and declare ``budgets`` as
+    ``{(method, route): max_queries}`` for every route in ``urlconf``, so
+    an N+1 regression against the seeded rows blows through the budget, and
+    a new route without a budget fails ``test_every_route_has_a_budget``.
+    """
+
+    urlconf = None
+    budgets = {}
+    latency_budget = 1.0  # seconds, generous enough for slow CI machines
+
+    def assertWithinBudget(self, method, route, path, **kwargs):
+        max_queries = self.budgets[(method, route)]
+        call = getattr(self.client, method.lower())
+
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = call(path, **kwargs)
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(response.status_code, 400, f"{method} {path}: {response.status_code}")
+
+        queries = ctx.captured_queries
+        self.assertLessEqual(
+            len(queries),
+            max_queries,
+            f"{method} {path} ran {len(queries)} queries, budget is {max_queries}:\n"
+            + "\n".join(query["sql"] for query in queries),
+        )
+        self.assertLess(
+            elapsed,
+            self.latency_budget,
+            f"{method} {path} took {elapsed * 1000:.0f}ms, budget is "
+            f"{self.latency_budget * 1000:.0f}ms",
+        )
+        return response
+
+    def test_every_route_has_a_budget(self):
+        routes = {str(pattern.pattern) for pattern in import_module(self.urlconf).urlpatterns}
+        budgeted = {route for _, route in self.budgets}
+        self.assertEqual(routes - budgeted, set(), "Routes without a query budget")
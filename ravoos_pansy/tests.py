@@ -0,0 +1,282 @@
+import datetime
+import json
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest, HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from cart.models import CartItem
+from cart.serializers import CartItemSerializer, cart_item_values
+from orders.models import Order, OrderItem
+from orders.serializers import (
+    OrderSerializer,
+    OrderSummarySerializer,
+    order_summary_values,
+    order_values,
+)
+from products.models import Category, Product
+from products.search import search_products
+from products.serializers import ProductReadSerializer, product_values
+from users.models import User
+from .metrics import RequestMetricsMiddleware, RequestStats, registry, serializer_timer
+from .renderers import FastJSONRenderer, iter_json_array, orjson
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        Product.objects.create(name="Burger", price="120.00", category=category)
+
+    def test_server_timing_header(self):
+        response = self.client.get("/api/products/")
+        timing = response["Server-Timing"]
+        for metric in ("db;", "serialize;", "app;", "render;", "total;"):
+            self.assertIn(metric, timing)
+        self.assertIn('desc="2 queries"', timing)
+
+    def test_serializer_time_excludes_sql(self):
+        stats = RequestStats()
+        request = HttpRequest()
+        request._request_stats = stats
+        with serializer_timer(request):
+            # Stands in for a query run by a lazy queryset
+            time.sleep(0.05)
+            stats.db_time += 0.05
+            with serializer_timer(request):  # nested timers count once
+                pass
+        self.assertGreaterEqual(stats.serialize_time, 0.0)
+        self.assertLess(stats.serialize_time, 0.04)
+
+    def test_streaming_responses_are_not_recorded(self):
+        admin = User.objects.create_user("admin@example.com", "Admin")
+        admin.is_staff = True
+        admin.save()
+        self.client.force_authenticate(user=admin)
+        response = self.client.get("/api/orders/admin/export/")
+        self.assertTrue(response.streaming)
+        self.assertNotIn("Server-Timing", response)
+        self.assertNotIn('route="api/orders/admin/export/"', registry.render())
+
+    def test_runs_natively_under_asgi(self):
+        async def get_response(request):
+            return HttpResponse("ok")
+
+        middleware = RequestMetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = APIRequestFactory().get("/")
+        request.resolver_match = None
+        response = async_to_sync(middleware)(request)
+        self.assertIn("total;", response["Server-Timing"])
+
+    def test_metrics_endpoint_aggregates_per_route(self):
+        self.client.get("/api/products/")
+        self.client.get("/api/products/")
+
+        admin = User.objects.create_user("admin@example.com", "Admin")
+        admin.is_staff = True
+        admin.save()
+        self.client.force_authenticate(user=admin)
+        response = self.client.get("/api/_metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("# TYPE ravoos_request_duration_seconds histogram", body)
+        self.assertIn(
+            'ravoos_request_duration_seconds_count{method="GET",route="api/products/"} 2',
+            body,
+        )
+        self.assertIn('ravoos_db_queries_bucket{method="GET",route="api/products/",le="+Inf"} 2', body)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.client.force_authenticate(user=User.objects.create_user("u@example.com", "User"))
+        self.assertEqual(self.client.get("/api/_metrics/").status_code, 403)
+
+
+class RequestMetricsDisabledTests(TestCase):
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_no_header_and_no_endpoint(self):
+        client = APIClient()
+        self.assertNotIn("Server-Timing", client.get("/api/categories/"))
+
+        admin = User.objects.create_user("admin@example.com", "Admin")
+        admin.is_staff = True
+        admin.save()
+        client.force_authenticate(user=admin)
+        self.assertEqual(client.get("/api/_metrics/").status_code, 404)
+
+
+class ValuesSerializerParityTests(TestCase):
+    """The .values() fast path must render exactly what the serializers do."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("buyer@example.com", "Buyer")
+        self.request = APIRequestFactory().get("/api/products/")
+        categories = [
+            Category.objects.create(name="Food & Drink", slug="food", theme="food"),
+            Category.objects.create(name="Gadgets", slug="gadgets", theme="tech"),
+        ]
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i} \u00e9", description="Tasty" if i % 2 else "",
+                price=f"{i * 7.5 + 0.05:.2f}", category=categories[i % 2],
+                image=f"products/{i}.jpg" if i % 3 else None,
+            )
+            for i in range(12)
+        ]
+        CartItem.objects.bulk_create(
+            CartItem(user=self.user, product=product, quantity=i + 1)
+            for i, product in enumerate(self.products[:5])
+        )
+        for i in range(4):
+            order = Order.objects.create(
+                user=self.user, subtotal="100.10", gst="5.01", discount="0", total="105.11",
+                address_text="1 Main St", status="placed",
+            )
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, product=product, quantity=2, price=product.price)
+                for product in self.products[i:i + 3]
+            )
+        OrderItem.objects.filter(pk=OrderItem.objects.first().pk).update(product=None)
+
+    def assertSameJSON(self, serializer_class, instances, fast, queryset, request=None):
+        context = {"request": request} if request else {}
+        expected = JSONRenderer().render(serializer_class(instances, many=True, context=context).data)
+        actual = JSONRenderer().render(fast.serialize(fast.values(queryset), request))
+        self.assertEqual(actual, expected)
+
+    def test_products(self):
+        queryset = Product.objects.select_related("category").order_by("id")
+        self.assertSameJSON(ProductReadSerializer, queryset, product_values, queryset)
+        self.assertSameJSON(ProductReadSerializer, queryset, product_values, queryset, self.request)
+
+    def test_product_search(self):
+        queryset = search_products(Product.objects.select_related("category"), "product")
+        self.assertSameJSON(ProductReadSerializer, queryset, product_values, queryset, self.request)
+
+    def test_cart_items(self):
+        queryset = CartItem.objects.filter(user=self.user).order_by("id")
+        self.assertSameJSON(
+            CartItemSerializer, queryset.select_related("product__category"),
+            cart_item_values, queryset, self.request,
+        )
+
+    def test_orders(self):
+        queryset = Order.objects.order_by("-created_at", "-id")
+        for zone in ("UTC", "Asia/Kolkata"):
+            with self.subTest(zone=zone), timezone.override(zone):
+                self.assertSameJSON(
+                    OrderSerializer, queryset.prefetch_related("items"), order_values, queryset,
+                )
+                self.assertSameJSON(
+                    OrderSummarySerializer, queryset, order_summary_values, queryset,
+                )
+
+    def test_orders_use_two_queries(self):
+        with self.assertNumQueries(2):
+            data = order_values.serialize(order_values.values(Order.objects.all()))
+        self.assertEqual(sum(len(order["items"]) for order in data), 12)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    payload = {
+        "price": Decimal("12.50"),
+        "when": datetime.datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=datetime.timezone.utc),
+        "local": timezone.make_aware(datetime.datetime(2026, 1, 2, 9, 0), timezone.get_fixed_timezone(330)),
+        "naive": datetime.datetime(2026, 1, 2, 3, 4, 5),
+        "day": datetime.date(2026, 1, 2),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": gettext_lazy("Order Placed"),
+        "text": "caf\u00e9 \u2028 \"quoted\" </script>",
+        "nested": [{"a": 1, "b": None, "c": True, "d": 1.5}, (1, 2)],
+        1: "int key",
+    }
+
+    def render(self, data, media_type=None):
+        return FastJSONRenderer().render(data, media_type)
+
+    def test_matches_drf_json_renderer(self):
+        expected = JSONRenderer().render(self.payload)
+        for backend in ("auto", "json"):
+            with self.subTest(backend=backend), self.settings(JSON_RENDERER_BACKEND=backend):
+                self.assertEqual(self.render(self.payload), expected)
+
+    @skipUnless(orjson, "orjson is not installed")
+    def test_differences_from_drf(self):
+        self.assertEqual(self.render({"x": 1.5e-7}), b'{"x":1.5e-7}')
+        self.assertEqual(JSONRenderer().render({"x": 1.5e-7}), b'{"x":1.5e-07}')
+
+        self.assertEqual(self.render([float("nan"), float("inf")]), b"[null,null]")
+        with self.assertRaises(ValueError):
+            JSONRenderer().render([float("nan")])
+
+    def test_falls_back_to_drf_for_big_ints(self):
+        payload = {"n": 2 ** 70, "price": Decimal("1.50")}
+        self.assertEqual(self.render(payload), JSONRenderer().render(payload))
+
+    def test_indent_uses_stdlib(self):
+        media_type = "application/json; indent=2"
+        self.assertEqual(
+            self.render(self.payload, media_type),
+            JSONRenderer().render(self.payload, media_type),
+        )
+
+    @override_settings(JSON_RENDERER_BACKEND="yaml")
+    def test_unknown_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.render({})
+
+    def test_iter_json_array(self):
+        chunks = [[{"id": 1}], [], [{"id": 2}, {"id": Decimal("3.5")}]]
+        self.assertEqual(b"".join(iter_json_array(chunks)), b'[{"id":1},{"id":2},{"id":3.5}]')
+        self.assertEqual(b"".join(iter_json_array([])), b"[]")
+
+
+class StreamedOrderHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("buyer@example.com", "Buyer")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Food", slug="food", theme="food")
+        product = Product.objects.create(name="Burger", price="120.00", category=category)
+        orders = Order.objects.bulk_create(
+            Order(user=self.user, subtotal="120.00", gst="6.00", total="126.00", address_text="1 Main St")
+            for _ in range(7)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=1, price="120.00") for order in orders
+        )
+
+    def test_long_history_is_streamed_in_chunks(self):
+        with mock.patch("orders.views.STREAM_CHUNK_SIZE", 3):
+            response = self.client.get("/api/orders/")
+            self.assertTrue(response.streaming)
+            self.assertTrue(response["ETag"])
+            # Each chunk of 3 orders fetches its items as it is sent
+            with self.assertNumQueries(3):
+                body = b"".join(response.streaming_content)
+
+        expected = order_values.serialize(
+            order_values.values(Order.objects.order_by("-created_at", "-id"))
+        )
+        self.assertEqual(json.loads(body), json.loads(JSONRenderer().render(expected)))
+
+    def test_short_history_is_not_streamed(self):
+        response = self.client.get("/api/orders/")
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data), 7)
+
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
+from .metrics import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -23,4 +24,7 @@ urlpatterns = [
     path("api/", include("products.urls")),
     path("api/cart/", include("cart.urls")),
     path("api/orders/", include("orders.urls")),
+    path("api/coupons/", include("coupons.urls")),
+    path("api/analytics/", include("analytics.urls")),
+    path("api/_metrics/", MetricsView.as_view()),
 ]
@@ -0,0 +1,162 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import DEFERRED
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+# The only user fields kept in the shared cache; the rest (including the
+# password hash) are loaded from the database if a view reads them
+SHARED_USER_FIELDS = ("id", "is_active", "is_staff")
+
+
+class TokenLRU:
+    """Thread-safe, size-bounded LRU of token key -> cache entry (see token_entry)."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            stale = [key for key, (value, _) in self._entries.items() if value["user"]["id"] == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenLRU(
+    settings.AUTH_TOKEN_CACHE["MAX_SIZE"],
+    settings.AUTH_TOKEN_CACHE["LOCAL_TTL"],
+)
+
+
+def shared_token_cache():
+    alias = settings.AUTH_TOKEN_CACHE["SHARED_ALIAS"]
+    return caches[alias] if alias else None
+
+
+def shared_key(key):
+    # Never put the bearer token itself in the cache server
+    return f"auth-token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def token_entry(token, fields=None):
+    """Plain values to cache for a resolved token: its creation time and user fields."""
+    user = token.user
+    return {
+        "created": token.created,
+        "user": {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if fields is None or field.attname in fields
+        },
+    }
+
+
+def token_from_entry(key, entry):
+    """A fresh Token and User for each request, so nothing set on them leaks into another."""
+    user_model = Token.user.field.related_model
+    values = entry["user"]
+    user = user_model.from_db(
+        Token.objects.db,
+        [field.attname for field in user_model._meta.concrete_fields],
+        [values.get(field.attname, DEFERRED) for field in user_model._meta.concrete_fields],
+    )
+    token = Token.from_db(Token.objects.db, ["key", "user_id", "created"], [key, user.pk, entry["created"]])
+    token.user = user
+    return token
+
+
+def token_expired(token):
+    ttl = settings.AUTH_TOKEN_TTL
+    return ttl is not None and token.created + timedelta(seconds=ttl) < timezone.now()
+
+
+def invalidate_tokens(keys, user_id=None):
+    """Drop cached resolutions for the given token keys (and user)."""
+    if user_id is not None:
+        token_cache.discard_user(user_id)
+    for key in keys:
+        token_cache.discard(key)
+
+    shared = shared_token_cache()
+    if shared is not None and keys:
+        shared.delete_many([shared_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF's TokenAuthentication.
+
+    Resolved tokens are cached so most requests skip the Token + User
+    query: in the shared cache when there is one, otherwise in a
+    per-process LRU. There is no local tier in front of a shared cache, so
+    a logout or user change made by any process applies to the next
+    request everywhere; without one, changes made outside the server
+    process (e.g. manage.py shell) are seen within LOCAL_TTL seconds.
+    Entries are invalidated when a token is deleted (logout) or its user is
+    saved (password, is_active or is_staff changes). Tokens older than
+    AUTH_TOKEN_TTL seconds are rejected.
+    """
+
+    def authenticate_credentials(self, key):
+        shared = shared_token_cache()
+        entry = shared.get(shared_key(key)) if shared is not None else token_cache.get(key)
+
+        if entry is None:
+            user, token = super().authenticate_credentials(key)
+            if shared is not None:
+                shared.set(
+                    shared_key(key),
+                    token_entry(token, SHARED_USER_FIELDS),
+                    settings.AUTH_TOKEN_CACHE["SHARED_TTL"],
+                )
+            else:
+                token_cache.set(key, token_entry(token))
+        else:
+            token = token_from_entry(key, entry)
+            if not token.user.is_active:
+                raise AuthenticationFailed("User inactive or deleted.")
+
+        if token_expired(token):
+            invalidate_tokens([key])
+            Token.objects.filter(key=key).delete()
+            raise AuthenticationFailed("Token has expired.")
+
+        return (token.user, token)
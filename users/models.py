@@ -17,6 +17,15 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Users from the shared token cache only carry their id and flags;
+        # the first other field a view reads loads all of them in one query
+        if fields is not None:
+            deferred = self.get_deferred_fields()
+            if deferred.intersection(fields):
+                fields = deferred.union(fields)
+        super().refresh_from_db(using, fields, **kwargs)
     
 #User = settings.AUTH_USER_MODEL
 
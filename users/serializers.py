@@ -3,6 +3,7 @@ from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 from .models import User
 from .models import Address
+from .authentication import token_expired
 
 # users/serializers.py
 class SignupSerializer(serializers.ModelSerializer):
@@ -29,6 +30,10 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid credentials")
 
         token, _ = Token.objects.get_or_create(user=user)
+        if token_expired(token):
+            # Issue a fresh token instead of handing back an expired one
+            token.delete()
+            token = Token.objects.create(user=user)
 
         return {
             "token": token.key,
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_tokens
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    # delete() clears the primary key (the token key), so read it now
+    keys = [instance.key]
+    transaction.on_commit(lambda: invalidate_tokens(keys))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    # Password, is_active and is_staff changes all go through save()
+    if created:
+        return
+    keys = list(Token.objects.filter(user=instance).values_list("key", flat=True))
+    transaction.on_commit(lambda: invalidate_tokens(keys, user_id=instance.pk))
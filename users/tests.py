@@ -1,3 +1,221 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ravoos_pansy.testing import QueryBudgetMixin
+from .authentication import CachedTokenAuthentication, TokenLRU, shared_key, token_cache
+from .models import Address, User
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user("buyer@example.com", "Buyer", "password")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def me(self):
+        return self.client.get("/api/auth/me/")
+
+    def test_repeat_requests_skip_the_token_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.me().status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.me().data["email"], "buyer@example.com")
+
+    def test_logout_invalidates(self):
+        self.me()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/auth/logout/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_deactivation_invalidates(self):
+        self.me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_staff_change_is_picked_up(self):
+        self.assertEqual(self.me().data["role"], "user")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+        self.assertEqual(self.me().data["role"], "admin")
+
+    @override_settings(AUTH_TOKEN_TTL=60)
+    def test_expired_token_is_rejected_and_rotated_on_login(self):
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - timedelta(seconds=120)
+        )
+        self.assertEqual(self.me().status_code, 401)
+        self.assertFalse(Token.objects.exists())
+
+        response = APIClient().post(
+            "/api/auth/login/", {"email": "buyer@example.com", "password": "password"}
+        )
+        self.assertNotEqual(response.data["token"], self.token.key)
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token nope")
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_cached_users_are_not_shared_between_requests(self):
+        auth = CachedTokenAuthentication()
+        first, _ = auth.authenticate_credentials(self.token.key)
+        first.name = "Changed by a request"
+
+        with self.assertNumQueries(0):
+            second, token = auth.authenticate_credentials(self.token.key)
+        self.assertIsNot(second, first)
+        self.assertIs(token.user, second)
+        self.assertEqual(second.name, "Buyer")
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    AUTH_TOKEN_CACHE={**settings.AUTH_TOKEN_CACHE, "SHARED_ALIAS": "default"},
+)
+class SharedTokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user("buyer@example.com", "Buyer", "password")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_only_ids_and_flags_are_shared(self):
+        self.client.get("/api/auth/me/")
+
+        self.assertIsNone(cache.get(f"auth-token:{self.token.key}"))
+        entry = cache.get(shared_key(self.token.key))
+        self.assertEqual(entry["user"], {"id": self.user.pk, "is_active": True, "is_staff": False})
+        self.assertEqual(entry["created"], self.token.created)
+        # Nothing is kept in-process in front of the shared tier
+        self.assertIsNone(token_cache.get(self.token.key))
+
+        # Other fields are loaded when a view reads them
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/auth/me/").data["email"], "buyer@example.com")
+
+    def test_logout_applies_at_once(self):
+        self.client.get("/api/auth/me/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/auth/logout/")
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+
+class TokenLRUTests(TestCase):
+    def entry(self, user_id=1):
+        return {"created": timezone.now(), "user": {"id": user_id}}
+
+    def test_is_bounded_and_evicts_least_recently_used(self):
+        lru = TokenLRU(max_size=2, ttl=60)
+        for key in "abc":
+            lru.set(key, self.entry())
+        self.assertIsNone(lru.get("a"))
+        self.assertIsNotNone(lru.get("b"))
+
+        lru.set("d", self.entry())
+        self.assertIsNotNone(lru.get("b"))
+        self.assertIsNone(lru.get("c"))
+
+    def test_entries_expire(self):
+        lru = TokenLRU(max_size=2, ttl=-1)
+        lru.set("a", self.entry())
+        self.assertIsNone(lru.get("a"))
+
+    def test_discard_user(self):
+        lru = TokenLRU(max_size=3, ttl=60)
+        lru.set("a", self.entry(1))
+        lru.set("b", self.entry(2))
+        lru.discard_user(1)
+        self.assertIsNone(lru.get("a"))
+        self.assertIsNotNone(lru.get("b"))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    urlconf = "users.urls"
+    budgets = {
+        ("POST", "signup/"): 2,
+        ("POST", "login/"): 5,  # first login creates the token
+        ("POST", "logout/"): 1,
+        ("GET", "me/"): 0,
+        ("GET", "addresses/"): 1,
+        ("POST", "addresses/"): 2,
+        ("PUT", "addresses/<int:pk>/"): 2,
+        ("DELETE", "addresses/<int:pk>/delete/"): 2,
+    }
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user("buyer@example.com", "Buyer", "password")
+        Address.objects.bulk_create(
+            Address(
+                user=self.user, full_name="Buyer", phone="1234567890", street=f"{i} Main St",
+                city="City", state="State", pincode="123456",
+            )
+            for i in range(50)
+        )
+        self.address = Address.objects.filter(user=self.user).first()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def address_data(self, **extra):
+        return {
+            "full_name": "Buyer", "phone": "1234567890", "street": "1 Main St",
+            "city": "City", "state": "State", "pincode": "123456", **extra,
+        }
+
+    def test_signup(self):
+        self.client.force_authenticate(user=None)
+        self.assertWithinBudget(
+            "POST", "signup/", "/api/auth/signup/",
+            data={"email": "new@example.com", "name": "New", "password": "password"},
+        )
+
+    def test_login(self):
+        self.client.force_authenticate(user=None)
+        self.assertWithinBudget(
+            "POST", "login/", "/api/auth/login/",
+            data={"email": "buyer@example.com", "password": "password"},
+        )
+
+    def test_logout(self):
+        token = Token.objects.create(user=self.user)
+        self.client.force_authenticate(user=self.user, token=token)
+        self.assertWithinBudget("POST", "logout/", "/api/auth/logout/")
+
+    def test_me(self):
+        self.assertWithinBudget("GET", "me/", "/api/auth/me/")
+
+    def test_addresses(self):
+        response = self.assertWithinBudget("GET", "addresses/", "/api/auth/addresses/")
+        self.assertEqual(len(response.data), 50)
+        self.assertWithinBudget(
+            "POST", "addresses/", "/api/auth/addresses/",
+            data=self.address_data(is_default=True),
+        )
+
+    def test_address_update(self):
+        self.assertWithinBudget(
+            "PUT", "addresses/<int:pk>/", f"/api/auth/addresses/{self.address.pk}/",
+            data=self.address_data(city="Elsewhere"),
+        )
+
+    def test_address_delete(self):
+        self.assertWithinBudget(
+            "DELETE", "addresses/<int:pk>/delete/",
+            f"/api/auth/addresses/{self.address.pk}/delete/",
+        )
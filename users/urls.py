@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import SignupView, LoginView, MeView
+from .views import SignupView, LoginView, LogoutView, MeView
 #Address imports
 from .views import (
     AddressListCreateView,
@@ -10,6 +10,7 @@ from .views import (
 urlpatterns = [
     path('signup/', SignupView.as_view()),
     path('login/', LoginView.as_view()),
+    path('logout/', LogoutView.as_view()),
     path('me/', MeView.as_view()),
 ]
 
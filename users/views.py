@@ -19,6 +19,14 @@ class LoginView(APIView):
         serializer.is_valid(raise_exception=True)
         return Response(serializer.validated_data)
 
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # Deleting the token also evicts it from the auth cache
+        request.auth.delete()
+        return Response({"message": "Logged out"})
+
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
 